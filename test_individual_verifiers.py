@@ -8,6 +8,39 @@ from verifiers.politics_verifier import verify_politics
 from verifiers.sports_verifier import verify_sports
 from verifiers.economics_verifier import verify_economics
 from verifiers.accuracy_scorer import update_accuracy, get_accuracy, reset_accuracy
+from verifiers.price_store import PriceStore, configure_price_store, get_price_store
+from verifiers.shared_cache import SharedCache, SharedCacheFull
+from verifiers import tracing
+from verifiers.response_store import ResponseStore, ResponseNotRecorded, configure_response_store
+from verifiers.router import verify
+from verifiers.routing import RoutingClassifier
+from verifiers.result import VerificationResult, Verdict, encode_results, decode_results
+from datetime import datetime, timezone
+from unittest import mock
+import io
+import json
+import os
+import tempfile
+import requests
+
+def fake_upstream(body, streamed=False):
+    """
+    Stand-in for requests.get that answers every GET with body (bytes or a
+    JSON-serializable value), either buffered or as an unread stream.
+    """
+    if not isinstance(body, bytes):
+        body = json.dumps(body).encode("utf-8")
+
+    def fake_get(url, params=None, timeout=None, stream=False):
+        resp = requests.Response()
+        resp.status_code = 200
+        resp.url = url
+        if streamed:
+            resp.raw = io.BytesIO(body)
+        else:
+            resp._content = body
+        return resp
+    return fake_get
 
 def test_price_verifier():
     prediction = {
@@ -61,6 +94,30 @@ def test_economics_verifier():
     print(f"Economics verifier result: {result}")
     return result
 
+def test_economics_streaming():
+    from verifiers import upstream
+    body = json.dumps([
+        {"DateTime": "2022-06-30T00:00:00", "Value": 24.9},
+        {"DateTime": "2022-09-30T00:00:00", "Value": 25.2},
+        {"DateTime": "2023-03-31T00:00:00", "Value": 26.1},
+    ]).encode("utf-8")
+
+    prediction = {"subject": "US GDP", "predicate": ">", "object": 25,
+                  "deadline": "2022-12-31T23:59:59Z", "context": "economics"}
+    previous = upstream.STREAM_JSON
+    upstream.STREAM_JSON = True
+    try:
+        with mock.patch("verifiers.upstream.requests.get", side_effect=fake_upstream(body, streamed=True)) as get:
+            result = verify_economics(prediction)
+    finally:
+        upstream.STREAM_JSON = previous
+    print(f"Economics streaming result: {result}")
+    if upstream.ijson is not None:
+        assert get.call_args.kwargs["stream"] is True
+    assert result["verdict"] == Verdict.TRUE
+    assert "2022-09-30" in result["justification"]
+    return result
+
 def test_accuracy_scorer():
     reset_accuracy()
     update_accuracy("alice", "US-politics", True)
@@ -70,6 +127,377 @@ def test_accuracy_scorer():
     print(f"Accuracy scorer result: {stats}")
     return stats
 
+def test_price_store():
+    with tempfile.TemporaryDirectory() as root:
+        csv_path = os.path.join(root, "dump.csv")
+        with open(csv_path, "w") as f:
+            f.write("symbol,date,open,high,low,close\n")
+            f.write("AAPL,2024-01-02,185.0,188.4,183.9,185.6\n")
+            f.write("AAPL,2024-01-03,184.2,185.9,183.4,184.3\n")
+            f.write("AAPL,2024-02-01,183.9,186.9,183.8,186.9\n")
+        store = PriceStore(os.path.join(root, "store"))
+        counts = store.import_csv(csv_path)
+        extrema = store.window_extrema(
+            "aapl",
+            datetime(2024, 1, 1, tzinfo=timezone.utc),
+            datetime(2024, 1, 31, tzinfo=timezone.utc),
+        )
+        store.close()
+    print(f"Price store result: {counts} {extrema}")
+    assert counts == {"AAPL": 3}
+    assert extrema["max_price"] == 188.4
+    assert extrema["min_price"] == 183.4
+    return extrema
+
+def test_price_store_chunked_import():
+    from verifiers import price_store
+    with tempfile.TemporaryDirectory() as root:
+        csv_path = os.path.join(root, "dump.csv")
+        with open(csv_path, "w") as f:
+            f.write("ticker,timestamp,open,high,low,close\n")
+            # Unsorted, interleaved symbols, and a timestamp repeated across chunks
+            for ts, sym, close in [(300, "A", 3), (100, "A", 1), (50, "B", 5), (200, "A", 2),
+                                   (100, "A", 10), (400, "A", 4), (60, "B", 6)]:
+                f.write(f"{sym},{ts},{close},{close},{close},{close}\n")
+        store = PriceStore(os.path.join(root, "store"))
+        store.write_rows("A", [(250, 9, 9, 9, 9), (300, 8, 8, 8, 8)])
+        with mock.patch.object(price_store, "IMPORT_CHUNK_ROWS", 2):
+            counts = store.import_csv(csv_path)
+        series = store._open("A")
+        stored = (list(series.columns["timestamp"]), list(series.columns["close"]))
+        leftovers = [name for name in os.listdir(os.path.join(root, "store", "A")) if not name.endswith(".f64")]
+        store.close()
+    print(f"Chunked price import result: {counts} {stored}")
+    assert counts == {"A": 5, "B": 2}
+    assert stored == ([100.0, 200.0, 250.0, 300.0, 400.0], [10.0, 2.0, 9.0, 3.0, 4.0])
+    assert leftovers == []
+    return stored
+
+def test_price_verifier_uses_store():
+    rows = [(datetime(2024, 1, day, tzinfo=timezone.utc).timestamp(), 185.0, 185.0 + day, 183.0, 185.0)
+            for day in range(1, 21)]
+    with tempfile.TemporaryDirectory() as root:
+        configure_price_store(root)
+        try:
+            # A miss is not cached: rows written by another store are picked up
+            assert not get_price_store().has_symbol("AAPL")
+            PriceStore(root).write_rows("AAPL", rows)
+            assert get_price_store().has_symbol("AAPL")
+            with mock.patch("verifiers.upstream.requests.get", side_effect=AssertionError("network used")):
+                result = verify_price_hit({"subject": "AAPL", "predicate": ">", "object": 200,
+                                           "deadline": "2024-01-31T00:00:00Z"})
+        finally:
+            configure_price_store("")
+    print(f"Price verifier from store: {result}")
+    assert result["verdict"] == Verdict.TRUE
+    assert result["source"].startswith("file://")
+    return result
+
+def test_result_serialization():
+    results = [
+        VerificationResult(Verdict.TRUE, 0.95, "Arsenal beat Liverpool (2-1).", "https://example.com"),
+        VerificationResult(Verdict.UNKNOWN, 0.0, "Missing team names or date.", None),
+    ]
+    assert results[0]["verdict"] == "true"
+    assert dict(results[0])["justification"] == "Arsenal beat Liverpool (2-1)."
+    decoded = decode_results(encode_results(results))
+    print(f"Result serialization result: {decoded}")
+    assert [dict(r) for r in decoded] == [dict(r) for r in results]
+    assert json.loads(json.dumps(results[0]))["verdict"] == "true"
+    results[1]["verdict"] = "True"
+    assert results[1].verdict is Verdict.TRUE
+    assert Verdict("FALSE") is Verdict.FALSE and Verdict("maybe") is Verdict.UNKNOWN
+    assert VerificationResult("Not Matured", 1.0, "").verdict is Verdict.NOT_MATURED
+    for bad in (None, 1):
+        try:
+            Verdict(bad)
+            raise AssertionError(f"Verdict({bad!r}) should raise")
+        except ValueError:
+            pass
+    return decoded
+
+def test_shared_cache():
+    with tempfile.TemporaryDirectory() as root:
+        cache = SharedCache(os.path.join(root, "test.cache"), size_bytes=1024 * 1024)
+        cache.set("https://example.com/a", b"first")
+        cache.set("https://example.com/a", b"second")
+        cache.update("counter", lambda old: str(int(old or b"0") + 1).encode())
+        cache.update("counter", lambda old: str(int(old or b"0") + 1).encode())
+        # A second handle on the same file sees the same data
+        other = SharedCache(os.path.join(root, "test.cache"))
+        values = (other.get("https://example.com/a"), other.get("counter"), other.get("missing"))
+        other.close()
+        cache.close()
+    print(f"Shared cache result: {values}")
+    assert values == (b"second", b"2", None)
+    return values
+
+def _shared_cache_writer(path, count):
+    cache = SharedCache(path, evict=False)
+    cache.set("writer", b"hello from another process")
+    for _ in range(count):
+        cache.update("counter", lambda old: str(int(old or b"0") + 1).encode())
+    cache.close()
+
+def test_shared_cache_processes():
+    import multiprocessing
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "accuracy.cache")
+        cache = SharedCache(path, size_bytes=1024 * 1024, evict=False)
+        writers = [context.Process(target=_shared_cache_writer, args=(path, 200)) for _ in range(2)]
+        for writer in writers:
+            writer.start()
+        for _ in range(200):
+            cache.update("counter", lambda old: str(int(old or b"0") + 1).encode())
+        for writer in writers:
+            writer.join(60)
+        values = (cache.get("writer"), cache.get("counter"))
+        # A non-evicting cache refuses new keys once full instead of dropping old ones
+        try:
+            for i in range(100000):
+                cache.set(f"filler-{i}", b"x" * 512)
+            full = False
+        except SharedCacheFull:
+            full = True
+        kept = cache.get("counter")
+        cache.close()
+    print(f"Shared cache across processes: {values}")
+    assert [w.exitcode for w in writers] == [0, 0]
+    assert values == (b"hello from another process", b"600")
+    assert full and kept == b"600"
+    return values
+
+def test_shared_cache_concurrent_reads():
+    import multiprocessing
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "accuracy.cache")
+        cache = SharedCache(path, size_bytes=1024 * 1024, evict=False)
+        cache.set("counter", b"0")
+        writer = context.Process(target=_shared_cache_writer, args=(path, 5000))
+        writer.start()
+        reads = misses = 0
+        while writer.is_alive() or reads < 1000:
+            reads += 1
+            if cache.get("counter") is None:
+                misses += 1
+        writer.join(60)
+        final = cache.get("counter")
+        cache.close()
+    print(f"Shared cache concurrent reads: {reads} reads, {misses} misses")
+    assert writer.exitcode == 0 and final == b"5000"
+    assert misses == 0
+    return reads
+
+def test_upstream_cache_best_effort():
+    from verifiers import upstream
+
+    cache = mock.Mock()
+    cache.get.return_value = None
+    cache.set.side_effect = ValueError("does not fit in the shared cache")
+    with mock.patch("verifiers.upstream.get_shared_cache", return_value=cache), \
+            mock.patch("verifiers.upstream.requests.get", side_effect=fake_upstream({"ok": True})):
+        resp = upstream.get("https://example.com/data")
+    print(f"Upstream with failing cache: {resp.json()}")
+    assert resp.json() == {"ok": True} and cache.set.called
+    return resp
+
+def test_tracing():
+    traces = []
+    callback = lambda root: traces.append(root.to_dict())
+    tracing.add_trace_callback(callback)
+    try:
+        # Missing fields: settled without any upstream request
+        verify({"type": "binary", "subject": "", "object": "", "context": "sports"})
+    finally:
+        tracing.remove_trace_callback(callback)
+    print(f"Tracing result: {traces}")
+    assert len(traces) == 1
+    assert traces[0]["attrs"]["verifier"] == "verify_sports"
+    assert [child["name"] for child in traces[0]["children"]] == ["route"]
+    # An unwritable trace file must not break settlement
+    with mock.patch.object(tracing, "TRACE_FILE", "/nonexistent/dir/trace.jsonl"):
+        result = verify({"type": "binary", "subject": "", "object": "", "context": "sports"})
+    assert result["verdict"] == "unknown"
+    return traces[0]
+
+def test_tracing_upstream_spans():
+    from verifiers import upstream
+
+    def names(span):
+        yield span["name"]
+        for child in span.get("children", []):
+            yield from names(child)
+
+    traces = []
+    callback = lambda root: traces.append(root.to_dict())
+    tracing.add_trace_callback(callback)
+    try:
+        with mock.patch.object(upstream, "STREAM_JSON", False), \
+                mock.patch("verifiers.upstream.requests.get",
+                           side_effect=fake_upstream([{"DateTime": "2022-09-30T00:00:00", "Value": 25.2}])):
+            verify({"subject": "US GDP", "predicate": ">", "object": 25,
+                    "deadline": "2022-12-31T23:59:59Z", "context": "economics"})
+    finally:
+        tracing.remove_trace_callback(callback)
+    print(f"Tracing upstream spans: {traces}")
+    assert len(traces) == 1
+    spans = list(names(traces[0]))
+    assert {"route", "upstream_request", "decode", "extract", "compare"} <= set(spans)
+    assert spans.index("upstream_request") < spans.index("extract") < spans.index("compare")
+    assert traces[0]["attrs"]["verdict"] == "true"
+    return traces[0]
+
+def test_response_store():
+    with tempfile.TemporaryDirectory() as root:
+        store = ResponseStore(root)
+        key = "https://en.wikipedia.org/w/api.php?action=query&format=json"
+        digest = store.save(key, 200, b'{"query": {}}')
+        # Identical bodies are stored once
+        assert store.save(key + "&list=search", 200, b'{"query": {}}') == digest
+        replay = ResponseStore(root, mode="replay")
+        loaded = replay.load(key)
+        try:
+            replay.load("https://example.com/never-recorded")
+            missing = False
+        except ResponseNotRecorded:
+            missing = True
+    print(f"Response store result: {loaded}")
+    assert loaded == (200, b'{"query": {}}')
+    assert missing
+    return loaded
+
+def test_upstream_record_replay():
+    from verifiers import upstream
+
+    with tempfile.TemporaryDirectory() as root:
+        cache = SharedCache(os.path.join(root, "responses.cache"), size_bytes=1024 * 1024)
+        # Already fetched by another worker
+        cache.set(upstream.request_key("https://example.com/cached"), b'{"source": "shared cache"}')
+        try:
+            configure_response_store(os.path.join(root, "store"), "record")
+            with mock.patch("verifiers.upstream.get_shared_cache", return_value=cache), \
+                    mock.patch("verifiers.upstream.requests.get", side_effect=fake_upstream({"source": "network"})):
+                recorded = [upstream.get("https://example.com/cached").json(),
+                            upstream.get("https://example.com/fetched", params={"q": 1, "apikey": "secret"}).json()]
+            configure_response_store(mode="replay")
+            with mock.patch("verifiers.upstream.requests.get", side_effect=AssertionError("network used")):
+                replayed = [upstream.get("https://example.com/cached").json(),
+                            upstream.get("https://example.com/fetched", params={"q": 1, "apikey": "rotated"}).json()]
+        finally:
+            configure_response_store("", "record")
+            cache.close()
+    print(f"Upstream record/replay result: {replayed}")
+    assert recorded == replayed == [{"source": "shared cache"}, {"source": "network"}]
+    return replayed
+
+def test_routing_classifier():
+    router = RoutingClassifier(
+        {"crypto": verify_price_hit},
+        [(verify_price_hit, ["btc", "stock"]), (verify_sports, ["man united", "chelsea"])],
+        verify_politics,
+    )
+    predictions = [
+        {"context": "Crypto", "subject": "anything"},
+        {"subject": "BTC/USD"},
+        {"subject": "Man United", "object": "Chelsea"},
+        {"subject": "Methodology"},
+    ]
+    routes = [(verifier.__name__, rule) for verifier, rule in router.classify_batch(predictions)]
+    for verifier, rule in router.classify_batch(predictions):
+        router.record(verifier, rule)
+    coverage = router.coverage()
+    print(f"Routing classifier result: {routes} {coverage}")
+    assert routes == [
+        ("verify_price_hit", "context"),
+        ("verify_price_hit", "subject"),
+        ("verify_sports", "subject"),
+        ("verify_politics", "fallback"),
+    ]
+    assert coverage["fallback_rate"] == 0.25
+    return coverage
+
+def test_router_catalogs():
+    from verifiers import router
+    router.reload_routes()
+    predictions = {
+        "Ada Lovelace": "llm_fallback_verifier",
+        "Polka dot dress sales": "llm_fallback_verifier",
+        "ADA": "verify_price_hit",
+        "SOL/USD": "verify_price_hit",
+        "Bitcoin": "verify_price_hit",
+        "BTC ETF approval": "verify_price_hit",
+        "BTC dominance": "verify_price_hit",
+        "ETH/BTC": "verify_price_hit",
+        "US GDP": "verify_economics",
+        "UK non farm payrolls": "verify_economics",
+        "Arsenal": "verify_sports",
+        "2024 presidential election": "verify_politics",
+    }
+    routes = {subject: router.route({"subject": subject}).__name__ for subject in predictions}
+    print(f"Router catalog result: {routes}")
+    assert routes == predictions
+    return routes
+
+def test_verification_service():
+    from verifiers import serve
+    import asyncio
+
+    def prediction(target, deadline="2024-01-31T00:00:00Z"):
+        return {"subject": "Bitcoin", "predicate": ">", "object": target, "deadline": deadline, "context": "crypto"}
+
+    real_batch_key = serve.batch_key
+
+    def poisoned_batch_key(p):
+        if p.get("object") == "poison":
+            raise TypeError("unhashable type: 'list'")
+        return real_batch_key(p)
+
+    async def scenario():
+        batcher = serve.MicroBatcher(workers=4, window_ms=20, max_batch=64, max_pending=8)
+        server = serve.VerificationServer(batcher)
+        runner = asyncio.ensure_future(batcher.run())
+        try:
+            # Same coin and deadline: one group, one upstream GET
+            status, shared = await server.dispatch("POST", "/verify", json.dumps([prediction(t) for t in (40000, 43000, 45000)]).encode())
+            assert status == 200 and [r["verdict"] for r in shared] == ["true", "true", "false"]
+            # A deadline that is not a string still gets a hashable key
+            status, odd = await server.dispatch("POST", "/verify", json.dumps(prediction(40000, deadline=[1])).encode())
+            assert status == 200 and odd["verdict"] == "unknown"
+            # A prediction that cannot be grouped fails alone and the batcher keeps running
+            with mock.patch("verifiers.serve.batch_key", side_effect=poisoned_batch_key):
+                status, mixed = await server.dispatch("POST", "/verify", json.dumps([prediction("poison"), prediction(40000)]).encode())
+            assert status == 200 and [r["verdict"] for r in mixed] == ["unknown", "true"]
+            status, rejected = await server.dispatch("POST", "/verify", json.dumps([prediction(40000)] * 9).encode())
+            assert status == 503
+            status, health = await server.dispatch("GET", "/health", b"")
+            assert status == 200 and health == {"status": "ok"}
+            status, metrics = await server.dispatch("GET", "/metrics", b"")
+            assert status == 200 and metrics["rejected"] == 9 and metrics["pending"] == 0
+            assert metrics["predictions"] == 6 and metrics["routes"]["total"] >= 5
+            # Round-trip over HTTP
+            tcp = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+            port = tcp.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GET /health HTTP/1.1\r\nConnection: close\r\n\r\n")
+            response = await reader.read()
+            writer.close()
+            tcp.close()
+            assert response.startswith(b"HTTP/1.1 200 OK") and response.endswith(b'{"status": "ok"}')
+            return metrics
+        finally:
+            runner.cancel()
+            batcher.close()
+
+    prices = {"prices": [[1704067200000, 42000.0], [1706000000000, 43500.0]]}
+    with mock.patch("verifiers.upstream.requests.get", side_effect=fake_upstream(prices)) as get:
+        metrics = asyncio.run(asyncio.wait_for(scenario(), timeout=30))
+    print(f"Verification service metrics: {metrics}")
+    # First batch shares one GET; the poisoned batch's good prediction makes the second
+    assert get.call_count == 2
+    return metrics
+
 if __name__ == "__main__":
     print("Testing Individual Verifiers")
     print("=" * 40)
@@ -82,4 +510,36 @@ if __name__ == "__main__":
     print("\n4. Testing Economics Verifier:")
     test_economics_verifier()
     print("\n5. Testing Accuracy Scorer:")
-    test_accuracy_scorer() 
\ No newline at end of file
+    test_accuracy_scorer()
+    print("\n6. Testing Price Store:")
+    test_price_store()
+    print("\n7. Testing Result Serialization:")
+    test_result_serialization()
+    print("\n8. Testing Shared Cache:")
+    test_shared_cache()
+    print("\n9. Testing Tracing:")
+    test_tracing()
+    print("\n10. Testing Response Store:")
+    test_response_store()
+    print("\n11. Testing Routing Classifier:")
+    test_routing_classifier() 
+    print("\n12. Testing Price Verifier With Local Store:")
+    test_price_verifier_uses_store()
+    print("\n13. Testing Economics Verifier Streaming:")
+    test_economics_streaming()
+    print("\n14. Testing Verification Service:")
+    test_verification_service()
+    print("\n15. Testing Shared Cache Across Processes:")
+    test_shared_cache_processes()
+    print("\n16. Testing Upstream With A Failing Cache:")
+    test_upstream_cache_best_effort()
+    print("\n17. Testing Tracing Of Upstream Spans:")
+    test_tracing_upstream_spans()
+    print("\n18. Testing Upstream Record And Replay:")
+    test_upstream_record_replay()
+    print("\n19. Testing Router Catalogs:")
+    test_router_catalogs()
+    print("\n20. Testing Chunked Price Import:")
+    test_price_store_chunked_import()
+    print("\n21. Testing Shared Cache Reads During Writes:")
+    test_shared_cache_concurrent_reads()
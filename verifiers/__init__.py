@@ -3,7 +3,8 @@ from .politics_verifier import verify_politics
 from .sports_verifier import verify_sports
 from .economics_verifier import verify_economics
 from .accuracy_scorer import update_accuracy, get_accuracy, reset_accuracy
-from .router import verify
+from .router import verify, verify_batch, classify_batch, route_coverage
+from .result import VerificationResult, Verdict, encode_results, decode_results
 
 __all__ = [
     'verify_price_hit',
@@ -13,5 +14,12 @@ __all__ = [
     'update_accuracy',
     'get_accuracy',
     'reset_accuracy',
-    'verify'
+    'verify',
+    'verify_batch',
+    'classify_batch',
+    'route_coverage',
+    'VerificationResult',
+    'Verdict',
+    'encode_results',
+    'decode_results'
 ] 
\ No newline at end of file
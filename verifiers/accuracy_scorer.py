@@ -1,17 +1,36 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import logging
+import struct
 from collections import defaultdict
+from .shared_cache import get_shared_cache
 
 logger = logging.getLogger(__name__)
 
 # In-memory stats: {predictor: {domain: [correct, total]}}
+# Used when no shared cache is configured; otherwise stats live in the
+# "accuracy" shared cache so every worker process sees the same numbers.
+# That cache never evicts: when it runs out of room updates raise
+# SharedCacheFull rather than silently dropping counters.
 _accuracy_stats = defaultdict(lambda: defaultdict(lambda: [0, 0]))
 
+_STATS = struct.Struct("<QQ")
+
+
+def _stats_key(predictor: str, domain: str) -> str:
+    return f"{len(predictor)}:{predictor}:{domain}"
+
 
 def update_accuracy(predictor: str, domain: str, correct: bool):
     """
     Update the rolling stats for a predictor in a domain.
     """
+    shared = get_shared_cache("accuracy", evict=False)
+    if shared is not None:
+        def bump(value: Optional[bytes]) -> bytes:
+            hits, total = _STATS.unpack(value) if value else (0, 0)
+            return _STATS.pack(hits + (1 if correct else 0), total + 1)
+        shared.update(_stats_key(predictor, domain), bump)
+        return
     stats = _accuracy_stats[predictor][domain]
     stats[1] += 1
     if correct:
@@ -22,8 +41,13 @@ def get_accuracy(predictor: str, domain: str) -> Dict[str, Any]:
     """
     Get the rolling accuracy stats for a predictor in a domain.
     """
-    stats = _accuracy_stats[predictor][domain]
-    correct, total = stats
+    shared = get_shared_cache("accuracy", evict=False)
+    if shared is not None:
+        value = shared.get(_stats_key(predictor, domain))
+        correct, total = _STATS.unpack(value) if value else (0, 0)
+    else:
+        stats = _accuracy_stats[predictor][domain]
+        correct, total = stats
     percent = (correct / total) * 100 if total > 0 else 0.0
     return {
         "predictor": predictor,
@@ -39,4 +63,7 @@ def reset_accuracy():
     """
     Reset all accuracy stats (for testing/demo).
     """
-    _accuracy_stats.clear() 
\ No newline at end of file
+    shared = get_shared_cache("accuracy", evict=False)
+    if shared is not None:
+        shared.clear()
+    _accuracy_stats.clear()
@@ -1,15 +1,22 @@
 from typing import Dict, Any
 import logging
-import requests
 import os
+from . import upstream
+from . import tracing
+from .result import VerificationResult, Verdict
 
 logger = logging.getLogger(__name__)
 
 TRADINGECONOMICS_API_URL = "https://api.tradingeconomics.com/historical/country/"
 TRADINGECONOMICS_API_KEY = os.getenv("TRADINGECONOMICS_API_KEY", "guest:guest")  # Use demo key if not set
 
+INDICATOR_MAP = {"CPI": "consumer price index cpi", "GDP": "gdp", "NFP": "non farm payrolls"}
 
-def verify_economics(prediction: Dict[str, Any]) -> Dict[str, Any]:
+# Subject/object keywords that route a prediction here (see router.py)
+ROUTING_KEYWORDS = [indicator.lower() for indicator in INDICATOR_MAP] + ['non farm payrolls']
+
+
+def verify_economics(prediction: Dict[str, Any]) -> VerificationResult:
     """
     Verifies economic indicators like CPI, GDP, NFP for a country/region and time period using TradingEconomics API.
     Args:
@@ -22,89 +29,94 @@ def verify_economics(prediction: Dict[str, Any]) -> Dict[str, Any]:
     target_value = prediction.get("object", None)
     deadline = prediction.get("deadline", "")
     if not subject or not predicate or target_value is None or not deadline:
-        return {
-            "verdict": "unknown",
-            "confidence": 0.0,
-            "justification": "Missing required fields for economics verification.",
-            "source": None
-        }
+        return VerificationResult(
+            verdict=Verdict.UNKNOWN,
+            confidence=0.0,
+            justification="Missing required fields for economics verification.",
+            source=None
+        )
     # Parse country and indicator
     # Example: subject = "UK CPI" or "US GDP"
     try:
         parts = subject.split()
         if len(parts) < 2:
-            return {
-                "verdict": "unknown",
-                "confidence": 0.0,
-                "justification": "Subject should be in format '<Country> <Indicator>'",
-                "source": None
-            }
+            return VerificationResult(
+                verdict=Verdict.UNKNOWN,
+                confidence=0.0,
+                justification="Subject should be in format '<Country> <Indicator>'",
+                source=None
+            )
         country = parts[0]
         indicator = parts[1]
         # Map indicator to TradingEconomics format
-        indicator_map = {"CPI": "consumer price index cpi", "GDP": "gdp", "NFP": "non farm payrolls"}
-        indicator_query = indicator_map.get(indicator.upper(), indicator.lower())
+        indicator_query = INDICATOR_MAP.get(indicator.upper(), indicator.lower())
         # Query TradingEconomics
         url = f"{TRADINGECONOMICS_API_URL}{country}/{indicator_query}"
         params = {"c": TRADINGECONOMICS_API_KEY}
-        resp = requests.get(url, params=params, timeout=10)
+        resp = upstream.get(url, params=params, timeout=10)
         resp.raise_for_status()
-        data = resp.json()
-        if not data:
-            return {
-                "verdict": "unknown",
-                "confidence": 0.0,
-                "justification": f"No data found for {subject}.",
-                "source": None
-            }
         # Find the latest value before the deadline
-        from datetime import datetime
+        from datetime import datetime, timezone
         deadline_dt = datetime.fromisoformat(deadline.replace('Z', '+00:00'))
+        if deadline_dt.tzinfo is None:
+            deadline_dt = deadline_dt.replace(tzinfo=timezone.utc)
         best = None
-        for entry in data:
-            try:
-                date_dt = datetime.fromisoformat(entry["DateTime"][:19])
-                if date_dt <= deadline_dt:
-                    if best is None or date_dt > best["date_dt"]:
-                        best = {"value": entry["Value"], "date_dt": date_dt, "date": entry["DateTime"]}
-            except Exception:
-                continue
+        seen = 0
+        with tracing.span("extract"):
+            for entry in upstream.iter_items(resp, "item"):
+                seen += 1
+                try:
+                    # TradingEconomics timestamps are UTC without an offset
+                    date_dt = datetime.fromisoformat(entry["DateTime"][:19]).replace(tzinfo=timezone.utc)
+                    if date_dt <= deadline_dt:
+                        if best is None or date_dt > best["date_dt"]:
+                            best = {"value": entry["Value"], "date_dt": date_dt, "date": entry["DateTime"]}
+                except Exception:
+                    continue
+        if not seen:
+            return VerificationResult(
+                verdict=Verdict.UNKNOWN,
+                confidence=0.0,
+                justification=f"No data found for {subject}.",
+                source=None
+            )
         if not best:
-            return {
-                "verdict": "unknown",
-                "confidence": 0.0,
-                "justification": f"No data before deadline for {subject}.",
-                "source": url
-            }
+            return VerificationResult(
+                verdict=Verdict.UNKNOWN,
+                confidence=0.0,
+                justification=f"No data before deadline for {subject}.",
+                source=url
+            )
         # Compare value
         value = best["value"]
-        if predicate == ">":
-            hit = value > target_value
-        elif predicate == "<":
-            hit = value < target_value
-        elif predicate == ">=":
-            hit = value >= target_value
-        elif predicate == "<=":
-            hit = value <= target_value
-        else:
-            return {
-                "verdict": "unknown",
-                "confidence": 0.0,
-                "justification": f"Unsupported predicate: {predicate}",
-                "source": url
-            }
-        verdict = "true" if hit else "false"
-        return {
-            "verdict": verdict,
-            "confidence": 0.9,
-            "justification": f"{subject} {predicate} {target_value}: value was {value} on {best['date']}",
-            "source": url
-        }
+        with tracing.span("compare"):
+            if predicate == ">":
+                hit = value > target_value
+            elif predicate == "<":
+                hit = value < target_value
+            elif predicate == ">=":
+                hit = value >= target_value
+            elif predicate == "<=":
+                hit = value <= target_value
+            else:
+                return VerificationResult(
+                    verdict=Verdict.UNKNOWN,
+                    confidence=0.0,
+                    justification=f"Unsupported predicate: {predicate}",
+                    source=url
+                )
+        verdict = Verdict.TRUE if hit else Verdict.FALSE
+        return VerificationResult(
+            verdict=verdict,
+            confidence=0.9,
+            justification=f"{subject} {predicate} {target_value}: value was {value} on {best['date']}",
+            source=url
+        )
     except Exception as e:
         logger.error(f"Economics verifier failed: {e}")
-        return {
-            "verdict": "unknown",
-            "confidence": 0.0,
-            "justification": f"Economics verifier error: {str(e)}",
-            "source": None
-        } 
\ No newline at end of file
+        return VerificationResult(
+            verdict=Verdict.UNKNOWN,
+            confidence=0.0,
+            justification=f"Economics verifier error: {str(e)}",
+            source=None
+        ) 
\ No newline at end of file
@@ -1,21 +1,26 @@
 from typing import Dict, Any
 import logging
-import requests
 import re
+from . import upstream
+from . import tracing
+from .result import VerificationResult, Verdict
 
 logger = logging.getLogger(__name__)
 
 WIKIPEDIA_API_URL = "https://en.wikipedia.org/w/api.php"
 
+# Subject/object keywords that route a prediction here (see router.py)
+ROUTING_KEYWORDS = ['biden', 'trump', 'harris', 'election', 'elections', 'president', 'presidential',
+                    'prime minister', 'referendum']
+
 
 def extract_winner_from_text(text: str):
     """
     Try to extract the winner(s) of an election from Wikipedia text using common patterns.
     Returns a list of winner names (may be empty if not found).
     """
-    text = text.lower()
     # Only use the first 2 paragraphs for precision
-    summary = "\n".join(text.split("\n")[:4])
+    summary = "\n".join(text.split("\n", 4)[:4]).lower()
     # Patterns to match
     patterns = [
         r"([a-z .'-]+?) (?:won|was elected|prevailed|defeated|beat|received the most votes|was the winner|was victorious|secured victory|was chosen as president|was chosen president)",
@@ -36,7 +41,7 @@ def extract_winner_from_text(text: str):
     winners = {w for w in winners if len(w) > 2}
     return list(winners)
 
-def verify_politics(prediction: Dict[str, Any]) -> Dict[str, Any]:
+def verify_politics(prediction: Dict[str, Any]) -> VerificationResult:
     """
     Verifies if a named candidate/entity won a specific election using Wikipedia.
     Args:
@@ -48,12 +53,12 @@ def verify_politics(prediction: Dict[str, Any]) -> Dict[str, Any]:
     obj = prediction.get("object", "")
     deadline = prediction.get("deadline", "")
     if not subject or not obj:
-        return {
-            "verdict": "unknown",
-            "confidence": 0.0,
-            "justification": "Missing candidate or election name.",
-            "source": None
-        }
+        return VerificationResult(
+            verdict=Verdict.UNKNOWN,
+            confidence=0.0,
+            justification="Missing candidate or election name.",
+            source=None
+        )
     # Try to find the Wikipedia page for the election
     try:
         search_query = obj + " election"
@@ -63,19 +68,19 @@ def verify_politics(prediction: Dict[str, Any]) -> Dict[str, Any]:
             "srsearch": search_query,
             "format": "json"
         }
-        resp = requests.get(WIKIPEDIA_API_URL, params=params, timeout=10)
+        resp = upstream.get(WIKIPEDIA_API_URL, params=params, timeout=10)
         resp.raise_for_status()
-        data = resp.json()
-        search_results = data.get("query", {}).get("search", [])
-        if not search_results:
-            return {
-                "verdict": "unknown",
-                "confidence": 0.0,
-                "justification": f"No Wikipedia page found for election: {obj}",
-                "source": None
-            }
+        # Only the first search hit is used, so stop reading after it
+        first_result = next(upstream.iter_items(resp, "query.search.item"), None)
+        if not first_result:
+            return VerificationResult(
+                verdict=Verdict.UNKNOWN,
+                confidence=0.0,
+                justification=f"No Wikipedia page found for election: {obj}",
+                source=None
+            )
         # Use the first result
-        page_title = search_results[0]["title"]
+        page_title = first_result["title"]
         page_url = f"https://en.wikipedia.org/wiki/{page_title.replace(' ', '_')}"
         # Get the page content
         params = {
@@ -85,55 +90,56 @@ def verify_politics(prediction: Dict[str, Any]) -> Dict[str, Any]:
             "titles": page_title,
             "format": "json"
         }
-        resp = requests.get(WIKIPEDIA_API_URL, params=params, timeout=10)
+        resp = upstream.get(WIKIPEDIA_API_URL, params=params, timeout=10)
         resp.raise_for_status()
-        data = resp.json()
-        pages = data.get("query", {}).get("pages", {})
-        extract = next(iter(pages.values())).get("extract", "")
-        lower_extract = extract.lower()
-        winners = extract_winner_from_text(lower_extract)
-        # Check for withdrawal
-        withdrew = False
-        for sentence in lower_extract.split('.'):
-            if subject in sentence and any(word in sentence for word in ["withdrew", "dropped out", "suspended"]):
-                withdrew = True
-                break
+        page = next(upstream.iter_values(resp, "query.pages"), {})
+        lower_extract = page.get("extract", "").lower()
+        with tracing.span("extract"):
+            winners = extract_winner_from_text(lower_extract)
+            # Check for withdrawal, one sentence at a time
+            withdrew = False
+            for match in re.finditer(r"[^.]*", lower_extract):
+                sentence = match.group()
+                if subject in sentence and any(word in sentence for word in ["withdrew", "dropped out", "suspended"]):
+                    withdrew = True
+                    break
         if withdrew:
-            return {
-                "verdict": "false",
-                "confidence": 0.9,
-                "justification": f"{prediction.get('subject')} withdrew or did not run in {obj}.",
-                "source": page_url
-            }
+            return VerificationResult(
+                verdict=Verdict.FALSE,
+                confidence=0.9,
+                justification=f"{prediction.get('subject')} withdrew or did not run in {obj}.",
+                source=page_url
+            )
         # Check if subject is among the winners
-        for winner in winners:
-            if subject in winner:
-                return {
-                    "verdict": "true",
-                    "confidence": 0.95,
-                    "justification": f"{prediction.get('subject')} is listed as the winner in Wikipedia for {obj}.",
-                    "source": page_url
-                }
+        with tracing.span("compare"):
+            for winner in winners:
+                if subject in winner:
+                    return VerificationResult(
+                        verdict=Verdict.TRUE,
+                        confidence=0.95,
+                        justification=f"{prediction.get('subject')} is listed as the winner in Wikipedia for {obj}.",
+                        source=page_url
+                    )
         # If another winner is found, return false and mention them
         if winners:
-            return {
-                "verdict": "false",
-                "confidence": 0.95,
-                "justification": f"{prediction.get('subject')} is not the winner. Winner(s): {', '.join(winners)}.",
-                "source": page_url
-            }
+            return VerificationResult(
+                verdict=Verdict.FALSE,
+                confidence=0.95,
+                justification=f"{prediction.get('subject')} is not the winner. Winner(s): {', '.join(winners)}.",
+                source=page_url
+            )
         # Fallback: unknown
-        return {
-            "verdict": "unknown",
-            "confidence": 0.0,
-            "justification": f"Could not determine winner from Wikipedia for {obj}.",
-            "source": page_url
-        }
+        return VerificationResult(
+            verdict=Verdict.UNKNOWN,
+            confidence=0.0,
+            justification=f"Could not determine winner from Wikipedia for {obj}.",
+            source=page_url
+        )
     except Exception as e:
         logger.error(f"Politics verifier failed: {e}")
-        return {
-            "verdict": "unknown",
-            "confidence": 0.0,
-            "justification": f"Politics verifier error: {str(e)}",
-            "source": None
-        } 
+        return VerificationResult(
+            verdict=Verdict.UNKNOWN,
+            confidence=0.0,
+            justification=f"Politics verifier error: {str(e)}",
+            source=None
+        ) 
@@ -0,0 +1,388 @@
+from typing import Dict, Any, Optional, Iterable, List, Tuple
+from datetime import datetime, timezone
+from array import array
+from bisect import bisect_left, bisect_right
+import csv
+import logging
+import mmap
+import os
+import re
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+# Directory holding the local price history, one sub-directory per symbol.
+# Leave unset to disable the local store and always go to the network.
+PRICE_STORE_DIR = os.getenv("TORUS_PRICE_STORE", "")
+
+COLUMNS = ("timestamp", "open", "high", "low", "close")
+
+# Rows buffered in memory during a bulk import before they are merged into the store
+IMPORT_CHUNK_ROWS = int(os.getenv("TORUS_PRICE_IMPORT_CHUNK_ROWS", "1000000"))
+_WRITE_BUFFER = 65536
+
+_TIMESTAMP_FIELDS = ("timestamp", "time", "date", "datetime")
+_SYMBOL_FIELDS = ("symbol", "ticker")
+
+
+def normalize_symbol(symbol: str) -> str:
+    """
+    Normalize a ticker so it can be used as a directory name ("brk.b" -> "BRK.B").
+    """
+    return re.sub(r"[^A-Z0-9._-]", "_", symbol.strip().upper())
+
+
+def _parse_timestamp(value: Any) -> float:
+    """
+    Convert an epoch (seconds or milliseconds) or ISO date string to epoch seconds.
+    """
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        text = str(value).strip()
+        try:
+            ts = float(text)
+            # Vendor dumps frequently use epoch milliseconds
+            return ts / 1000.0 if ts > 1e11 else ts
+        except ValueError:
+            dt = datetime.fromisoformat(text.replace('Z', '+00:00'))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def _find_field(fields: Iterable[str], candidates: Tuple[str, ...]) -> Optional[str]:
+    lookup = {f.strip().lower(): f for f in fields}
+    for name in candidates:
+        if name in lookup:
+            return lookup[name]
+    return None
+
+
+def _stamp(path: str) -> Optional[Tuple[int, ...]]:
+    # Inode of every column file. Writers swap in new files with os.replace,
+    # so a changed stamp means the symbol was rewritten, possibly by another process.
+    try:
+        stats = [os.stat(os.path.join(path, f"{name}.f64")) for name in COLUMNS]
+    except FileNotFoundError:
+        return None
+    if stats[0].st_size == 0:
+        return None
+    return tuple(st.st_ino for st in stats)
+
+
+class _Series:
+    """
+    Read-only memory-mapped view of one symbol's columns.
+    """
+
+    def __init__(self, path: str, stamp: Tuple[int, ...]):
+        self.path = path
+        self.stamp = stamp
+        self._maps = []
+        self.columns = {}
+        for name in COLUMNS:
+            with open(os.path.join(path, f"{name}.f64"), "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps.append(mm)
+            self.columns[name] = memoryview(mm).cast("d")
+
+    def __len__(self):
+        return len(self.columns["timestamp"])
+
+    def consistent(self) -> bool:
+        # False while a writer is half-way through swapping the columns
+        return len({len(view) for view in self.columns.values()}) == 1
+
+    def close(self):
+        for view in self.columns.values():
+            view.release()
+        self.columns = {}
+        for mm in self._maps:
+            mm.close()
+        self._maps = []
+
+
+def _new_columns() -> Dict[str, array]:
+    return {name: array("d") for name in COLUMNS}
+
+
+class _ColumnWriter:
+    """
+    Buffered writer for one column, written to a private temporary file and
+    swapped in with commit(), so concurrent imports never share a file.
+    """
+
+    def __init__(self, path: str, name: str):
+        self.target = os.path.join(path, f"{name}.f64")
+        fd, self.tmp = tempfile.mkstemp(dir=path, prefix=f".{name}-")
+        self.file = os.fdopen(fd, "wb")
+        self.buffer = array("d")
+
+    def append(self, value: float):
+        self.buffer.append(value)
+        if len(self.buffer) >= _WRITE_BUFFER:
+            self.flush()
+
+    def write_view(self, view: memoryview):
+        self.flush()
+        self.file.write(view)
+
+    def flush(self):
+        self.buffer.tofile(self.file)
+        self.buffer = array("d")
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+    def commit(self):
+        os.replace(self.tmp, self.target)
+
+    def discard(self):
+        self.file.close()
+        os.unlink(self.tmp)
+
+
+class PriceStore:
+    """
+    Local columnar price history backed by memory-mapped files.
+
+    Each symbol is stored as one flat file of native doubles per column
+    (timestamp, open, high, low, close), sorted by timestamp. Reads map the
+    files instead of loading them, so window queries only touch the pages
+    they need.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._series: Dict[str, _Series] = {}
+
+    def _symbol_dir(self, symbol: str) -> str:
+        return os.path.join(self.root, normalize_symbol(symbol))
+
+    def _open(self, symbol: str) -> Optional[_Series]:
+        key = normalize_symbol(symbol)
+        path = self._symbol_dir(key)
+        stamp = _stamp(path)
+        series = self._series.get(key)
+        if series is not None and series.stamp == stamp:
+            return series
+        self._invalidate(key)
+        if stamp is None:
+            return None
+        series = _Series(path, stamp)
+        if not series.consistent():
+            series.close()
+            return None
+        self._series[key] = series
+        return series
+
+    def _invalidate(self, symbol: str):
+        # Slices of the old maps may still be in use on other threads, so
+        # leave closing them to garbage collection
+        self._series.pop(normalize_symbol(symbol), None)
+
+    def reload(self):
+        """
+        Drop all open memory maps so the next lookups re-read the files.
+        """
+        self._series.clear()
+
+    def close(self):
+        """
+        Release all open memory maps.
+        """
+        for series in self._series.values():
+            series.close()
+        self._series.clear()
+
+    def has_symbol(self, symbol: str) -> bool:
+        return self._open(symbol) is not None
+
+    def symbols(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            name for name in os.listdir(self.root)
+            if os.path.isfile(os.path.join(self.root, name, "timestamp.f64"))
+        )
+
+    def write_rows(self, symbol: str, rows: Iterable[Tuple[float, float, float, float, float]]) -> int:
+        """
+        Merge (timestamp, open, high, low, close) rows into a symbol's history.
+        Rows with an existing timestamp replace the stored values.
+
+        Returns:
+            Number of rows stored for the symbol after the merge
+        """
+        columns = _new_columns()
+        for row in rows:
+            for name, value in zip(COLUMNS, row):
+                columns[name].append(float(value))
+        return self._merge_columns(symbol, columns)
+
+    def _merge_columns(self, symbol: str, new: Dict[str, array]) -> int:
+        # Merge unsorted new rows into the mapped history, streaming the
+        # result into temporary column files. Untouched runs of the old
+        # history are copied straight from the maps.
+        new_ts = new["timestamp"]
+        order = sorted(range(len(new_ts)), key=new_ts.__getitem__)
+        series = self._open(symbol)
+        old = series.columns if series is not None else None
+        old_ts = old["timestamp"] if old is not None else array("d")
+
+        path = self._symbol_dir(symbol)
+        os.makedirs(path, exist_ok=True)
+        writers = {name: _ColumnWriter(path, name) for name in COLUMNS}
+        try:
+            count = i = k = 0
+            while k < len(order):
+                # Among rows with the same timestamp the last one imported wins
+                while k + 1 < len(order) and new_ts[order[k + 1]] == new_ts[order[k]]:
+                    k += 1
+                row = order[k]
+                pos = bisect_left(old_ts, new_ts[row], i)
+                if pos > i:
+                    for name, writer in writers.items():
+                        writer.write_view(old[name][i:pos])
+                    count += pos - i
+                i = pos + 1 if pos < len(old_ts) and old_ts[pos] == new_ts[row] else pos
+                for name, writer in writers.items():
+                    writer.append(new[name][row])
+                count += 1
+                k += 1
+            if i < len(old_ts):
+                for name, writer in writers.items():
+                    writer.write_view(old[name][i:])
+                count += len(old_ts) - i
+            for writer in writers.values():
+                writer.close()
+        except BaseException:
+            for writer in writers.values():
+                writer.discard()
+            raise
+        # Every column is written before any is swapped in, so readers never
+        # see columns of different lengths for long.
+        for writer in writers.values():
+            writer.commit()
+        self._invalidate(symbol)
+        return count
+
+    def _import_records(self, records: Iterable[Dict[str, Any]], fields: List[str], symbol: Optional[str]) -> Dict[str, int]:
+        ts_field = _find_field(fields, _TIMESTAMP_FIELDS)
+        sym_field = _find_field(fields, _SYMBOL_FIELDS)
+        value_fields = [_find_field(fields, (name,)) for name in COLUMNS[1:]]
+        if ts_field is None or None in value_fields:
+            raise ValueError(f"Price dump must have timestamp/open/high/low/close columns, got: {fields}")
+        if sym_field is None and not symbol:
+            raise ValueError("Price dump has no symbol column; pass symbol explicitly")
+
+        # Rows are buffered as flat double columns and merged into the store
+        # every IMPORT_CHUNK_ROWS rows, so memory stays bounded on large dumps.
+        pending: Dict[str, Dict[str, array]] = {}
+        stored: Dict[str, int] = {}
+        buffered = skipped = 0
+        for record in records:
+            try:
+                row = (_parse_timestamp(record[ts_field]),) + tuple(float(record[f]) for f in value_fields)
+            except (TypeError, ValueError):
+                skipped += 1
+                continue
+            key = normalize_symbol(symbol or str(record[sym_field]))
+            columns = pending.get(key)
+            if columns is None:
+                columns = pending[key] = _new_columns()
+            for name, value in zip(COLUMNS, row):
+                columns[name].append(value)
+            buffered += 1
+            if buffered >= IMPORT_CHUNK_ROWS:
+                stored.update((key, self._merge_columns(key, columns)) for key, columns in pending.items())
+                pending.clear()
+                buffered = 0
+        stored.update((key, self._merge_columns(key, columns)) for key, columns in pending.items())
+        if skipped:
+            logger.warning(f"Skipped {skipped} malformed rows while importing price dump")
+        return stored
+
+    def import_csv(self, path: str, symbol: Optional[str] = None) -> Dict[str, int]:
+        """
+        Bulk-import a vendor CSV dump.
+
+        Args:
+            path: CSV file with timestamp/date, open, high, low, close and optionally symbol columns
+            symbol: Symbol for all rows when the file has no symbol column
+
+        Returns:
+            Mapping of symbol to number of stored rows
+        """
+        with open(path, newline="") as f:
+            reader = csv.DictReader(f)
+            return self._import_records(reader, list(reader.fieldnames or []), symbol)
+
+    def import_parquet(self, path: str, symbol: Optional[str] = None) -> Dict[str, int]:
+        """
+        Bulk-import a vendor Parquet dump. Requires pyarrow.
+        """
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("pyarrow is required to import Parquet price dumps") from e
+        parquet = pq.ParquetFile(path)
+
+        def records():
+            for batch in parquet.iter_batches():
+                columns = batch.to_pydict()
+                for values in zip(*columns.values()):
+                    yield dict(zip(columns, values))
+
+        return self._import_records(records(), list(parquet.schema_arrow.names), symbol)
+
+    def window_extrema(self, symbol: str, start: datetime, end: datetime) -> Optional[Dict[str, Any]]:
+        """
+        Highest high and lowest low for a symbol between start and end (inclusive).
+
+        Returns:
+            Price data dictionary in the same shape as the network fetchers,
+            or None if the symbol or window has no local data
+        """
+        series = self._open(symbol)
+        if series is None:
+            return None
+        cols = series.columns
+        lo = bisect_left(cols["timestamp"], start.timestamp())
+        hi = bisect_right(cols["timestamp"], end.timestamp())
+        if lo >= hi:
+            return None
+        # Memoryview slices share the mapped pages; nothing is copied.
+        return {
+            'max_price': max(cols["high"][lo:hi]),
+            'min_price': min(cols["low"][lo:hi]),
+            'reliable_data': hi - lo > 10,
+            'source_url': f"file://{series.path}"
+        }
+
+
+_default_store: Optional[PriceStore] = None
+
+
+def get_price_store() -> Optional[PriceStore]:
+    """
+    Shared store rooted at TORUS_PRICE_STORE, or None if it is not configured.
+    """
+    global _default_store
+    if not PRICE_STORE_DIR:
+        return None
+    if _default_store is None:
+        _default_store = PriceStore(PRICE_STORE_DIR)
+    return _default_store
+
+
+def configure_price_store(root: Optional[str] = None):
+    """
+    Override TORUS_PRICE_STORE at runtime. Pass root="" to disable the store.
+    """
+    global PRICE_STORE_DIR, _default_store
+    if root is not None:
+        PRICE_STORE_DIR = root
+    _default_store = None
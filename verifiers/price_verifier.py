@@ -2,11 +2,37 @@ import requests
 from datetime import datetime, timezone, timedelta
 from typing import Dict, Any, Optional
 import logging
+from .price_store import get_price_store
+from . import upstream
+from . import tracing
+from .result import VerificationResult, Verdict
 
 logger = logging.getLogger(__name__)
 
+# Map common asset names to CoinGecko IDs
+ASSET_IDS = {
+    'bitcoin': 'bitcoin',
+    'btc': 'bitcoin',
+    'ethereum': 'ethereum',
+    'eth': 'ethereum',
+    'cardano': 'cardano',
+    'ada': 'cardano',
+    'solana': 'solana',
+    'sol': 'solana',
+    'polkadot': 'polkadot',
+    'dot': 'polkadot'
+}
 
-def verify_price_hit(prediction: Dict[str, Any]) -> Dict[str, Any]:
+# These tickers are ordinary words or names elsewhere ("Ada Lovelace", "polka dot"),
+# so on their own they only route here when they are the whole subject or object
+ROUTING_TICKERS = ['ada', 'sol', 'dot']
+
+# Subject/object keywords that route a prediction here (see router.py)
+ROUTING_KEYWORDS = [name for name in ASSET_IDS if name not in ROUTING_TICKERS] + \
+    [f"{ticker} usd" for ticker in ROUTING_TICKERS] + ['stock', 'stocks', 'price', 'prices']
+
+
+def verify_price_hit(prediction: Dict[str, Any]) -> VerificationResult:
     """
     Verifies if an asset crossed a threshold before a deadline.
     
@@ -23,100 +49,102 @@ def verify_price_hit(prediction: Dict[str, Any]) -> Dict[str, Any]:
         deadline = prediction.get('deadline')
         
         if not all([subject, predicate, target_value, deadline]):
-            return {
-                "verdict": "unknown",
-                "confidence": 0.0,
-                "justification": "Missing required fields for price verification",
-                "source": None
-            }
+            return VerificationResult(
+                verdict=Verdict.UNKNOWN,
+                confidence=0.0,
+                justification="Missing required fields for price verification",
+                source=None
+            )
         
         # Parse deadline
         if not deadline:
-            return {
-                "verdict": "unknown",
-                "confidence": 0.0,
-                "justification": "Missing deadline",
-                "source": None
-            }
+            return VerificationResult(
+                verdict=Verdict.UNKNOWN,
+                confidence=0.0,
+                justification="Missing deadline",
+                source=None
+            )
         
         try:
             deadline_dt = datetime.fromisoformat(deadline.replace('Z', '+00:00'))
         except:
-            return {
-                "verdict": "unknown",
-                "confidence": 0.0,
-                "justification": "Invalid deadline format",
-                "source": None
-            }
+            return VerificationResult(
+                verdict=Verdict.UNKNOWN,
+                confidence=0.0,
+                justification="Invalid deadline format",
+                source=None
+            )
         
         # Check if prediction has matured
         now = datetime.now(timezone.utc)
         if now < deadline_dt:
-            return {
-                "verdict": "not matured",
-                "confidence": 1.0,
-                "justification": f"Prediction deadline {deadline} has not passed yet",
-                "source": None
-            }
+            return VerificationResult(
+                verdict=Verdict.NOT_MATURED,
+                confidence=1.0,
+                justification=f"Prediction deadline {deadline} has not passed yet",
+                source=None
+            )
         
         # Get asset price data from CoinGecko
         price_data = _get_asset_price_data(subject, deadline_dt)
         
         if not price_data:
-            return {
-                "verdict": "unknown",
-                "confidence": 0.0,
-                "justification": f"Could not fetch price data for {subject}",
-                "source": None
-            }
+            return VerificationResult(
+                verdict=Verdict.UNKNOWN,
+                confidence=0.0,
+                justification=f"Could not fetch price data for {subject}",
+                source=None
+            )
         
         # Check if threshold was crossed
         max_price = price_data.get('max_price', 0)
         min_price = price_data.get('min_price', float('inf'))
         
-        if predicate == '>':
-            hit = max_price > target_value
-            comparison = f"max price {max_price} vs target {target_value}"
-        elif predicate == '<':
-            hit = min_price < target_value
-            comparison = f"min price {min_price} vs target {target_value}"
-        elif predicate == '>=':
-            hit = max_price >= target_value
-            comparison = f"max price {max_price} vs target {target_value}"
-        elif predicate == '<=':
-            hit = min_price <= target_value
-            comparison = f"min price {min_price} vs target {target_value}"
-        else:
-            return {
-                "verdict": "unknown",
-                "confidence": 0.0,
-                "justification": f"Unsupported predicate: {predicate}",
-                "source": None
-            }
-        
-        verdict = "true" if hit else "false"
+        with tracing.span("compare"):
+            if predicate == '>':
+                hit = max_price > target_value
+                side, observed = "max", max_price
+            elif predicate == '<':
+                hit = min_price < target_value
+                side, observed = "min", min_price
+            elif predicate == '>=':
+                hit = max_price >= target_value
+                side, observed = "max", max_price
+            elif predicate == '<=':
+                hit = min_price <= target_value
+                side, observed = "min", min_price
+            else:
+                return VerificationResult(
+                    verdict=Verdict.UNKNOWN,
+                    confidence=0.0,
+                    justification=f"Unsupported predicate: {predicate}",
+                    source=None
+                )
+        
+        verdict = Verdict.TRUE if hit else Verdict.FALSE
         confidence = 0.95 if price_data.get('reliable_data') else 0.7
         
-        return {
-            "verdict": verdict,
-            "confidence": confidence,
-            "justification": f"{subject} {predicate} {target_value}: {comparison}",
-            "source": price_data.get('source_url')
-        }
+        return VerificationResult(
+            verdict=verdict,
+            confidence=confidence,
+            justification=f"{subject} {predicate} {target_value}: {side} price {observed} vs target {target_value}",
+            source=price_data.get('source_url')
+        )
         
     except Exception as e:
         logger.error(f"Error in price verification: {e}")
-        return {
-            "verdict": "unknown",
-            "confidence": 0.0,
-            "justification": f"Price verification failed: {str(e)}",
-            "source": None
-        }
+        return VerificationResult(
+            verdict=Verdict.UNKNOWN,
+            confidence=0.0,
+            justification=f"Price verification failed: {str(e)}",
+            source=None
+        )
 
 
 def _get_asset_price_data(subject: str, deadline: datetime) -> Optional[Dict[str, Any]]:
     """
-    Fetches historical price data for an asset from CoinGecko.
+    Fetches historical price data for an asset from the local price store,
+    falling back to CoinGecko.
     
     Args:
         subject: Asset name/symbol
@@ -126,26 +154,20 @@ def _get_asset_price_data(subject: str, deadline: datetime) -> Optional[Dict[str
         Price data dictionary or None if failed
     """
     try:
-        # Map common asset names to CoinGecko IDs
-        asset_mapping = {
-            'bitcoin': 'bitcoin',
-            'btc': 'bitcoin',
-            'ethereum': 'ethereum',
-            'eth': 'ethereum',
-            'cardano': 'cardano',
-            'ada': 'cardano',
-            'solana': 'solana',
-            'sol': 'solana',
-            'polkadot': 'polkadot',
-            'dot': 'polkadot'
-        }
+        # Calculate date range (30 days before deadline to deadline)
+        from_date = deadline - timedelta(days=30)
+        
+        # Prefer the local price history (e.g. equities) when one is configured
+        store = get_price_store()
+        if store is not None:
+            with tracing.span("price_store"):
+                local_data = store.window_extrema(subject, from_date, deadline)
+            if local_data:
+                return local_data
         
         # Clean and map subject
         subject_clean = subject.lower().strip()
-        coin_id = asset_mapping.get(subject_clean, subject_clean)
-        
-        # Calculate date range (30 days before deadline to deadline)
-        from_date = deadline - timedelta(days=30)
+        coin_id = ASSET_IDS.get(subject_clean, subject_clean)
         
         # CoinGecko API endpoint for historical data
         url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart/range"
@@ -155,24 +177,29 @@ def _get_asset_price_data(subject: str, deadline: datetime) -> Optional[Dict[str
             'to': int(deadline.timestamp())
         }
         
-        response = requests.get(url, params=params, timeout=10)
+        response = upstream.get(url, params=params, timeout=10)
         response.raise_for_status()
         
-        data = response.json()
-        prices = data.get('prices', [])
-        
-        if not prices:
+        # Track extrema while walking the [timestamp, price] pairs
+        max_price = None
+        min_price = None
+        points = 0
+        with tracing.span("extract"):
+            for price in upstream.iter_items(response, 'prices.item'):
+                value = price[1]
+                if max_price is None or value > max_price:
+                    max_price = value
+                if min_price is None or value < min_price:
+                    min_price = value
+                points += 1
+        
+        if not points:
             return None
         
-        # Extract price data
-        price_values = [price[1] for price in prices]
-        max_price = max(price_values)
-        min_price = min(price_values)
-        
         return {
             'max_price': max_price,
             'min_price': min_price,
-            'reliable_data': len(prices) > 10,  # Consider reliable if we have >10 data points
+            'reliable_data': points > 10,  # Consider reliable if we have >10 data points
             'source_url': f"https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart/range"
         }
         
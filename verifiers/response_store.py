@@ -0,0 +1,132 @@
+from typing import Dict, Any, Optional, Tuple
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+import zlib
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Directory of recorded upstream responses. Leave unset to disable.
+RESPONSE_STORE_DIR = os.getenv("TORUS_RESPONSE_STORE", "")
+# "record" fetches from the network and persists every response;
+# "replay" serves only from the store and never touches the network.
+RESPONSE_STORE_MODE = os.getenv("TORUS_RESPONSE_STORE_MODE", "record")
+
+MODES = ("record", "replay")
+
+
+class ResponseNotRecorded(requests.RequestException):
+    """
+    Raised in replay mode for a request that was never recorded.
+    """
+
+
+class ResponseStore:
+    """
+    Content-addressed store of raw upstream responses.
+
+    Bodies are zlib-compressed and stored once per distinct content under
+    objects/<sha256>; index/<sha256 of request key> maps each normalized
+    request to its status and body hash. Writes go through a temporary file
+    and os.replace, so concurrent workers can record into the same store.
+    """
+
+    def __init__(self, root: str, mode: str = "record", level: int = 6):
+        if mode not in MODES:
+            raise ValueError(f"Unknown response store mode: {mode}")
+        self.root = root
+        self.mode = mode
+        self.level = level
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def _path(self, kind: str, digest: str) -> str:
+        return os.path.join(self.root, kind, digest[:2], digest)
+
+    def _index_path(self, key: str) -> str:
+        return self._path("index", hashlib.sha256(key.encode("utf-8")).hexdigest())
+
+    def _write(self, path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def save(self, key: str, status: int, body: bytes) -> str:
+        """
+        Record the response for a request key.
+
+        Returns:
+            SHA-256 of the body, which names the stored object
+        """
+        digest = hashlib.sha256(body).hexdigest()
+        object_path = self._path("objects", digest)
+        if not os.path.exists(object_path):
+            self._write(object_path, zlib.compress(body, self.level))
+        entry = {"key": key, "status": status, "sha256": digest, "size": len(body), "recorded_at": time.time()}
+        self._write(self._index_path(key), json.dumps(entry).encode("utf-8"))
+        return digest
+
+    def entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Index entry for a request key, or None if it was never recorded.
+        """
+        try:
+            with open(self._index_path(key), "rb") as f:
+                return json.loads(f.read())
+        except FileNotFoundError:
+            return None
+
+    def load(self, key: str) -> Tuple[int, bytes]:
+        """
+        Recorded (status, body) for a request key.
+        """
+        entry = self.entry(key)
+        if entry is None:
+            raise ResponseNotRecorded(f"No recorded response for {key}")
+        with open(self._path("objects", entry["sha256"]), "rb") as f:
+            return entry["status"], zlib.decompress(f.read())
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self._index_path(key))
+
+
+_default_store: Optional[ResponseStore] = None
+
+
+def get_response_store() -> Optional[ResponseStore]:
+    """
+    Shared store rooted at TORUS_RESPONSE_STORE, or None if it is not configured.
+    """
+    global _default_store
+    if not RESPONSE_STORE_DIR:
+        return None
+    if _default_store is None:
+        _default_store = ResponseStore(RESPONSE_STORE_DIR, RESPONSE_STORE_MODE)
+    return _default_store
+
+
+def configure_response_store(root: Optional[str] = None, mode: Optional[str] = None):
+    """
+    Override the TORUS_RESPONSE_STORE settings at runtime, e.g. to replay a
+    recorded settlement. Pass root="" to disable the store.
+    """
+    global RESPONSE_STORE_DIR, RESPONSE_STORE_MODE, _default_store
+    if mode is not None and mode not in MODES:
+        raise ValueError(f"Unknown response store mode: {mode}")
+    if root is not None:
+        RESPONSE_STORE_DIR = root
+    if mode is not None:
+        RESPONSE_STORE_MODE = mode
+    _default_store = None
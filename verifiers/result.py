@@ -0,0 +1,202 @@
+from typing import Dict, Any, Optional, Iterable, List, Tuple, Union
+from array import array
+from enum import Enum
+import struct
+import sys
+import zlib
+
+KEYS = ("verdict", "confidence", "justification", "source")
+
+
+class Verdict(str, Enum):
+    TRUE = "true"
+    FALSE = "false"
+    NOT_MATURED = "not matured"
+    UNKNOWN = "unknown"
+
+    @classmethod
+    def _missing_(cls, value):
+        # Verdict strings from the LLM fallback or older callers are not
+        # always canonical ("True", "FALSE"); unrecognised strings are UNKNOWN.
+        # Anything that is not a string is a caller bug and still raises.
+        if not isinstance(value, str):
+            return None
+        for member in cls:
+            if member.value == value.strip().lower():
+                return member
+        return cls.UNKNOWN
+
+
+# Stable one-byte codes for the binary format; append only.
+_VERDICT_CODES = {Verdict.TRUE: 0, Verdict.FALSE: 1, Verdict.NOT_MATURED: 2, Verdict.UNKNOWN: 3}
+_VERDICTS_BY_CODE = {code: verdict for verdict, code in _VERDICT_CODES.items()}
+
+
+class VerificationResult(dict):
+    """
+    Result of a verifier: verdict, confidence, justification and source.
+
+    A plain dict with the same keys verifiers have always returned, so
+    results can be mutated and passed straight to json.dumps; the
+    attributes are typed views of those keys. It carries no memory saving
+    over a dict. For storing large batches compactly use encode_results.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, verdict: Union[Verdict, str], confidence: float, justification: str,
+                 source: Optional[str] = None):
+        super().__init__(verdict=Verdict(verdict).value, confidence=confidence,
+                         justification=justification, source=source)
+
+    @property
+    def verdict(self) -> Verdict:
+        return Verdict(self.get("verdict"))
+
+    @property
+    def confidence(self) -> float:
+        return self.get("confidence", 0.0)
+
+    @property
+    def justification(self) -> str:
+        return self.get("justification", "")
+
+    @property
+    def source(self) -> Optional[str]:
+        return self.get("source")
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "VerificationResult":
+        return cls(data.get("verdict", Verdict.UNKNOWN), data.get("confidence", 0.0),
+                   data.get("justification", ""), data.get("source"))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: self.get(key) for key in KEYS}
+
+
+# Binary batch format: header, then columns. All integers and floats are
+# little-endian.
+#   magic "TVR1", flags (u8), row count (u32)
+#   verdict codes      u8  * rows
+#   confidences        f64 * rows
+#   source dictionary  u32 count, then u32 byte lengths, then utf-8 bytes
+#   source indexes     u32 * rows (0xFFFFFFFF for None)
+#   justifications     u32 byte lengths * rows, then utf-8 bytes (absent
+#                      if the batch was written without justifications)
+# With the compressed flag everything after the header is zlib-compressed.
+_MAGIC = b"TVR1"
+_HEADER = struct.Struct("<4sBI")
+_FLAG_COMPRESSED = 1
+_FLAG_JUSTIFICATIONS = 2
+_NO_SOURCE = 0xFFFFFFFF
+
+
+def _le(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _read_array(typecode: str, data: memoryview, offset: int, count: int) -> Tuple[array, int]:
+    values = array(typecode)
+    end = offset + values.itemsize * count
+    values.frombytes(data[offset:end])
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values, end
+
+
+def _pack_strings(strings: List[str]) -> bytes:
+    encoded = [s.encode("utf-8") for s in strings]
+    return _le(array("I", [len(b) for b in encoded])) + b"".join(encoded)
+
+
+def _unpack_strings(data: memoryview, offset: int, count: int) -> Tuple[List[str], int]:
+    lengths, offset = _read_array("I", data, offset, count)
+    strings = []
+    for length in lengths:
+        strings.append(bytes(data[offset:offset + length]).decode("utf-8"))
+        offset += length
+    return strings, offset
+
+
+def encode_results(results: Iterable[Union[VerificationResult, Dict[str, Any]]],
+                   justifications: bool = True, compress: bool = True) -> bytes:
+    """
+    Serialize a batch of results into a compact columnar binary blob.
+
+    Args:
+        results: VerificationResult objects or result dicts
+        justifications: Store justifications; skipping them keeps the blob much smaller
+        compress: zlib-compress the column data
+
+    Returns:
+        Encoded bytes, readable with decode_results
+    """
+    verdicts = array("B")
+    confidences = array("d")
+    source_indexes = array("I")
+    sources: Dict[str, int] = {}
+    texts = []
+    for result in results:
+        if not isinstance(result, VerificationResult):
+            result = VerificationResult.from_dict(result)
+        verdicts.append(_VERDICT_CODES[result.verdict])
+        confidences.append(float(result.confidence))
+        if result.source is None:
+            source_indexes.append(_NO_SOURCE)
+        else:
+            source_indexes.append(sources.setdefault(result.source, len(sources)))
+        if justifications:
+            texts.append(result.justification)
+
+    body = [
+        verdicts.tobytes(),
+        _le(confidences),
+        struct.pack("<I", len(sources)),
+        _pack_strings(list(sources)),
+        _le(source_indexes),
+    ]
+    if justifications:
+        body.append(_pack_strings(texts))
+    payload = b"".join(body)
+    flags = _FLAG_JUSTIFICATIONS if justifications else 0
+    if compress:
+        payload = zlib.compress(payload)
+        flags |= _FLAG_COMPRESSED
+    return _HEADER.pack(_MAGIC, flags, len(verdicts)) + payload
+
+
+def decode_results(data: bytes) -> List[VerificationResult]:
+    """
+    Inverse of encode_results. Results written without justifications get an
+    empty justification.
+    """
+    magic, flags, rows = _HEADER.unpack_from(data)
+    if magic != _MAGIC:
+        raise ValueError("Not an encoded verification result batch")
+    payload = data[_HEADER.size:]
+    if flags & _FLAG_COMPRESSED:
+        payload = zlib.decompress(payload)
+    view = memoryview(payload)
+
+    verdicts, offset = _read_array("B", view, 0, rows)
+    confidences, offset = _read_array("d", view, offset, rows)
+    (source_count,) = struct.unpack_from("<I", view, offset)
+    sources, offset = _unpack_strings(view, offset + 4, source_count)
+    source_indexes, offset = _read_array("I", view, offset, rows)
+    if flags & _FLAG_JUSTIFICATIONS:
+        texts, offset = _unpack_strings(view, offset, rows)
+    else:
+        texts = [""] * rows
+
+    return [
+        VerificationResult(
+            _VERDICTS_BY_CODE[verdicts[i]],
+            confidences[i],
+            texts[i],
+            None if source_indexes[i] == _NO_SOURCE else sources[source_indexes[i]],
+        )
+        for i in range(rows)
+    ]
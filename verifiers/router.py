@@ -1,9 +1,15 @@
-from typing import Dict, Any
+from typing import Dict, Any, Callable, List, Optional, Tuple
 import logging
+from . import price_verifier, politics_verifier, sports_verifier, economics_verifier
 from .price_verifier import verify_price_hit
 from .politics_verifier import verify_politics
 from .sports_verifier import verify_sports
 from .economics_verifier import verify_economics
+from .price_store import get_price_store
+from .routing import RoutingClassifier
+from .result import VerificationResult, Verdict
+from . import upstream
+from . import tracing
 import os
 import openai
 import json
@@ -11,7 +17,7 @@ import json
 logger = logging.getLogger(__name__)
 
 
-def llm_fallback_verifier(prediction: Dict[str, Any]) -> Dict[str, Any]:
+def llm_fallback_verifier(prediction: Dict[str, Any]) -> VerificationResult:
     """
     Uses OpenAI GPT-4o to check the prediction and return a verdict in the required format.
     """
@@ -59,26 +65,100 @@ Return only the JSON object, nothing else.
                 result["justification"] = "LLM justification unavailable."
             if not (isinstance(result["source"], str) or result["source"] is None):
                 result["source"] = None
-            return result
+            return VerificationResult.from_dict(result)
         except Exception as parse_err:
             logger.error(f"Failed to parse LLM output: {llm_output}\nError: {parse_err}")
-            return {
-                "verdict": "unknown",
-                "confidence": 0.5,
-                "justification": "LLM fallback used, but output could not be parsed.",
-                "source": "llm://gpt-4o"
-            }
+            return VerificationResult(
+                verdict=Verdict.UNKNOWN,
+                confidence=0.5,
+                justification="LLM fallback used, but output could not be parsed.",
+                source="llm://gpt-4o"
+            )
     except Exception as e:
         logger.error(f"OpenAI API call failed: {e}")
-        return {
-            "verdict": "unknown",
-            "confidence": 0.5,
-            "justification": f"LLM fallback failed: {str(e)}",
-            "source": "llm://gpt-4o"
-        }
+        return VerificationResult(
+            verdict=Verdict.UNKNOWN,
+            confidence=0.5,
+            justification=f"LLM fallback failed: {str(e)}",
+            source="llm://gpt-4o"
+        )
+
+
+# Context keywords, looked up in a hash map before any subject matching
+CONTEXT_ROUTES = {
+    **dict.fromkeys(['crypto', 'stocks', 'trading'], verify_price_hit),
+    **dict.fromkeys(['politics', 'election', 'government'], verify_politics),
+    **dict.fromkeys(['sports', 'football', 'basketball', 'soccer'], verify_sports),
+    **dict.fromkeys(['economics', 'cpi', 'gdp', 'employment'], verify_economics),
+}
+
+_router: Optional[RoutingClassifier] = None
+
+
+def _build_router() -> RoutingClassifier:
+    # Keyword catalogs live next to each verifier; earlier entries win ties
+    keyword_routes = [
+        (verify_price_hit, price_verifier.ROUTING_KEYWORDS),
+        (verify_politics, politics_verifier.ROUTING_KEYWORDS),
+        (verify_sports, sports_verifier.ROUTING_KEYWORDS),
+        (verify_economics, economics_verifier.ROUTING_KEYWORDS),
+    ]
+    # Coin tickers and symbols with local price history route to the price
+    # verifier when they are the whole subject or object
+    exact_routes = dict.fromkeys(price_verifier.ROUTING_TICKERS, verify_price_hit)
+    store = get_price_store()
+    if store is not None:
+        exact_routes.update(dict.fromkeys(store.symbols(), verify_price_hit))
+    return RoutingClassifier(CONTEXT_ROUTES, keyword_routes, llm_fallback_verifier, exact_routes)
+
+
+def get_router() -> RoutingClassifier:
+    """
+    The compiled router, built from the keyword catalogs on first use.
+    """
+    global _router
+    if _router is None:
+        _router = _build_router()
+    return _router
+
+
+def reload_routes():
+    """
+    Recompile the router, e.g. after importing new symbols into the price store.
+    """
+    global _router
+    _router = _build_router()
 
 
-def verify(prediction: Dict[str, Any]) -> Dict[str, Any]:
+def route(prediction: Dict[str, Any]) -> Callable[[Dict[str, Any]], VerificationResult]:
+    """
+    Picks the verifier for a prediction without running it.
+    
+    Args:
+        prediction: Structured prediction object
+        
+    Returns:
+        Verifier function to call with the prediction
+    """
+    return get_router().classify(prediction)[0]
+
+
+def classify_batch(predictions: List[Dict[str, Any]]) -> List[Optional[Tuple[Callable, str]]]:
+    """
+    Routes many predictions at once, see RoutingClassifier.classify_batch.
+    """
+    return get_router().classify_batch(predictions)
+
+
+def route_coverage() -> Dict[str, Any]:
+    """
+    How verified predictions were routed so far, including the share that
+    fell through to the LLM.
+    """
+    return get_router().coverage()
+
+
+def verify(prediction: Dict[str, Any]) -> VerificationResult:
     """
     Main router that dispatches predictions to the correct verifier.
     
@@ -88,37 +168,41 @@ def verify(prediction: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Verification result with verdict, confidence, justification, and source
     """
-    try:
-        context = prediction.get('context', '').lower()
-        pred_type = prediction.get('type', '')
+    return _verify_routed(prediction, None)
+
+
+def _verify_routed(prediction: Dict[str, Any], routed: Optional[Tuple[Callable, str]]) -> VerificationResult:
+    with tracing.trace("verify") as root:
+        try:
+            with tracing.span("route"):
+                router = get_router()
+                verifier, rule = routed or router.classify(prediction)
+            router.record(verifier, rule)
+            root.set(context=prediction.get('context'), verifier=verifier.__name__, rule=rule)
+            result = verifier(prediction)
+        except Exception as e:
+            logger.error(f"Error in verification router: {e}")
+            result = VerificationResult(
+                verdict=Verdict.UNKNOWN,
+                confidence=0.0,
+                justification=f"Verification failed: {str(e)}",
+                source=None
+            )
+        root.set(verdict=result["verdict"])
+        return result
+
+
+def verify_batch(predictions: List[Dict[str, Any]]) -> List[VerificationResult]:
+    """
+    Verifies several predictions, fetching each distinct upstream URL only once.
+    
+    Args:
+        predictions: Structured prediction objects, ideally sharing upstream data
+        (same coin and deadline, same election, same matchday)
         
-        # Route based on context
-        if context in ['crypto', 'stocks', 'trading']:
-            return verify_price_hit(prediction)
-        elif context in ['politics', 'election', 'government']:
-            return verify_politics(prediction)
-        elif context in ['sports', 'football', 'basketball', 'soccer']:
-            return verify_sports(prediction)
-        elif context in ['economics', 'cpi', 'gdp', 'employment']:
-            return verify_economics(prediction)
-        else:
-            # Fallback based on subject/predicate patterns
-            subject = prediction.get('subject', '').lower()
-            if any(asset in subject for asset in ['btc', 'bitcoin', 'eth', 'ethereum', 'stock', 'price']):
-                return verify_price_hit(prediction)
-            elif any(pol in subject for pol in ['biden', 'trump', 'election', 'president']):
-                return verify_politics(prediction)
-            elif any(sport in subject for sport in ['arsenal', 'liverpool', 'team', 'match']):
-                return verify_sports(prediction)
-            else:
-                # Final fallback: LLM API
-                return llm_fallback_verifier(prediction)
-                
-    except Exception as e:
-        logger.error(f"Error in verification router: {e}")
-        return {
-            "verdict": "unknown",
-            "confidence": 0.0,
-            "justification": f"Verification failed: {str(e)}",
-            "source": None
-        } 
\ No newline at end of file
+    Returns:
+        Verification results in the same order as predictions
+    """
+    routes = classify_batch(predictions)
+    with upstream.shared_responses():
+        return [_verify_routed(prediction, routed) for prediction, routed in zip(predictions, routes)]
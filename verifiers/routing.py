@@ -0,0 +1,135 @@
+from typing import Dict, Any, Callable, Iterable, List, Optional, Sequence, Tuple
+from collections import Counter
+import re
+import threading
+
+Verifier = Callable[[Dict[str, Any]], Any]
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+# Marks the end of a keyword in the token trie; tokens are never empty
+_END = ""
+
+
+def tokenize(text: Any) -> List[str]:
+    """
+    Lower-cased alphanumeric tokens ("Man. United FC" -> ["man", "united", "fc"]).
+    """
+    return _TOKEN_RE.findall(str(text).lower())
+
+
+class RoutingClassifier:
+    """
+    Precompiled prediction router.
+
+    Contexts are looked up in a hash map. Otherwise the subject, then the
+    object, is matched in one pass against a token trie holding every
+    keyword phrase of every verifier; when several verifiers match, the one
+    listed first in keyword_routes wins. Anything unmatched goes to fallback.
+    """
+
+    def __init__(self, context_routes: Dict[str, Verifier],
+                 keyword_routes: Sequence[Tuple[Verifier, Iterable[str]]],
+                 fallback: Verifier,
+                 exact_routes: Optional[Dict[str, Verifier]] = None):
+        self.context_routes = {context.lower(): verifier for context, verifier in context_routes.items()}
+        self.exact_routes = {" ".join(tokenize(k)): v for k, v in (exact_routes or {}).items()}
+        self.fallback = fallback
+        self._verifiers = [verifier for verifier, _ in keyword_routes]
+        self._trie: Dict[str, Any] = {}
+        for priority, (_, keywords) in enumerate(keyword_routes):
+            for keyword in keywords:
+                tokens = tokenize(keyword)
+                if not tokens:
+                    continue
+                node = self._trie
+                for token in tokens:
+                    node = node.setdefault(token, {})
+                node[_END] = min(node.get(_END, priority), priority)
+        self._lock = threading.Lock()
+        self._counts: Counter = Counter()
+
+    def _match(self, text: Any) -> Optional[Verifier]:
+        tokens = tokenize(text)
+        if not tokens:
+            return None
+        exact = self.exact_routes.get(" ".join(tokens))
+        if exact is not None:
+            return exact
+        best = None
+        trie = self._trie
+        for start in range(len(tokens)):
+            node = trie
+            for token in tokens[start:]:
+                node = node.get(token)
+                if node is None:
+                    break
+                priority = node.get(_END)
+                if priority is not None and (best is None or priority < best):
+                    best = priority
+                    if best == 0:
+                        return self._verifiers[0]
+        return None if best is None else self._verifiers[best]
+
+    def classify(self, prediction: Dict[str, Any]) -> Tuple[Verifier, str]:
+        """
+        Verifier for a prediction and the rule that chose it:
+        "context", "subject", "object" or "fallback".
+        """
+        verifier = self.context_routes.get(str(prediction.get('context', '')).lower().strip())
+        if verifier is not None:
+            return verifier, "context"
+        verifier = self._match(prediction.get('subject', ''))
+        if verifier is not None:
+            return verifier, "subject"
+        verifier = self._match(prediction.get('object', ''))
+        if verifier is not None:
+            return verifier, "object"
+        return self.fallback, "fallback"
+
+    def classify_batch(self, predictions: Iterable[Dict[str, Any]]) -> List[Optional[Tuple[Verifier, str]]]:
+        """
+        classify() for many predictions, matching each distinct
+        (context, subject, object) only once. Entries are None for
+        predictions that could not be classified (e.g. not a dict).
+        """
+        seen: Dict[Tuple[str, str, str], Tuple[Verifier, str]] = {}
+        routes = []
+        for prediction in predictions:
+            try:
+                key = (str(prediction.get('context', '')), str(prediction.get('subject', '')), str(prediction.get('object', '')))
+                if key not in seen:
+                    seen[key] = self.classify(prediction)
+                routes.append(seen[key])
+            except Exception:
+                routes.append(None)
+        return routes
+
+    def record(self, verifier: Verifier, rule: str, count: int = 1):
+        """
+        Count a routed prediction towards coverage().
+        """
+        with self._lock:
+            self._counts[(verifier.__name__, rule)] += count
+
+    def coverage(self) -> Dict[str, Any]:
+        """
+        How recorded predictions were routed, per verifier and per rule.
+        """
+        with self._lock:
+            counts = dict(self._counts)
+        total = sum(counts.values())
+        by_verifier: Counter = Counter()
+        by_rule: Counter = Counter()
+        for (verifier, rule), count in counts.items():
+            by_verifier[verifier] += count
+            by_rule[rule] += count
+        return {
+            "total": total,
+            "by_verifier": dict(by_verifier),
+            "by_rule": dict(by_rule),
+            "fallback_rate": by_rule["fallback"] / total if total else 0.0,
+        }
+
+    def reset_coverage(self):
+        with self._lock:
+            self._counts.clear()
@@ -0,0 +1,269 @@
+"""
+Local HTTP verification service with micro-batching.
+
+    python -m verifiers.serve --port 8080 --workers 16
+
+Endpoints:
+    POST /verify   body is one prediction object or a list of them
+    GET  /health   liveness check
+    GET  /metrics  request, batch and queue counters
+
+Incoming predictions are collected for a few milliseconds, grouped by
+verifier and upstream key (same coin and deadline, same election, same
+matchday, same economic series) and each group is settled with
+verify_batch, so predictions sharing upstream data share one fetch.
+"""
+from typing import Dict, Any, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import asyncio
+import json
+import logging
+import time
+
+from .router import route, verify_batch, route_coverage
+from .price_verifier import verify_price_hit
+from .politics_verifier import verify_politics
+from .sports_verifier import verify_sports
+from .economics_verifier import verify_economics
+from .result import VerificationResult, Verdict
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+# Predictions whose keys match are very likely to issue the same upstream GETs.
+# Fields come from client JSON, so keys are built from strings to stay hashable.
+_UPSTREAM_KEYS = {
+    verify_price_hit: lambda p: (str(p.get('subject', '')).lower().strip(), str(p.get('deadline', ''))),
+    verify_politics: lambda p: str(p.get('object', '')).lower().strip(),
+    verify_sports: lambda p: str(p.get('deadline', ''))[:10],
+    verify_economics: lambda p: str(p.get('subject', '')).upper().strip(),
+}
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 503: "Service Unavailable"}
+
+
+def batch_key(prediction: Dict[str, Any]) -> Tuple[str, Any]:
+    """
+    Grouping key for a prediction: its verifier plus the upstream data it needs.
+    Predictions without a shareable key get a key of their own.
+    """
+    try:
+        verifier = route(prediction)
+    except Exception:
+        return ("error", id(prediction))
+    key_fn = _UPSTREAM_KEYS.get(verifier)
+    if key_fn is None:
+        return (verifier.__name__, id(prediction))
+    return (verifier.__name__, key_fn(prediction))
+
+
+class MicroBatcher:
+    """
+    Collects submitted predictions into short windows and settles each
+    (verifier, upstream key) group on a worker thread.
+    """
+
+    def __init__(self, workers: int, window_ms: float, max_batch: int, max_pending: int):
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="verify")
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.pending = 0
+        self.tasks = set()
+        self.stats = {"predictions": 0, "rejected": 0, "batches": 0, "batched": 0, "groups": 0}
+
+    def has_capacity(self, count: int) -> bool:
+        return self.pending + count <= self.max_pending
+
+    def submit(self, prediction: Dict[str, Any]) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self.pending += 1
+        self.stats["predictions"] += 1
+        self.queue.put_nowait((prediction, future))
+        return future
+
+    async def run(self):
+        while True:
+            batch = [await self.queue.get()]
+            # Let the window fill before draining the queue
+            await asyncio.sleep(self.window)
+            while len(batch) < self.max_batch and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            groups: Dict[Tuple[str, Any], List] = {}
+            for item in batch:
+                # A malformed prediction fails on its own, not the whole batch
+                try:
+                    groups.setdefault(batch_key(item[0]), []).append(item)
+                except Exception as e:
+                    logger.error(f"Could not group prediction: {e}")
+                    self._fail([item], e)
+            self.stats["batches"] += 1
+            self.stats["batched"] += len(batch)
+            self.stats["groups"] += len(groups)
+            for items in groups.values():
+                try:
+                    task = asyncio.ensure_future(self._settle(items))
+                except Exception as e:
+                    logger.error(f"Could not dispatch batch: {e}")
+                    self._fail(items, e)
+                    continue
+                # The loop only keeps weak references to tasks
+                self.tasks.add(task)
+                task.add_done_callback(self.tasks.discard)
+
+    def _fail(self, items: List, error: Exception):
+        for _, future in items:
+            if not future.done():
+                future.set_exception(error)
+        self.pending -= len(items)
+
+    async def _settle(self, items: List):
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self.executor, verify_batch, [p for p, _ in items])
+        except Exception as e:
+            logger.error(f"Batch settlement failed: {e}")
+            self._fail(items, e)
+            return
+        for (_, future), result in zip(items, results):
+            if not future.done():
+                future.set_result(result)
+        self.pending -= len(items)
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+
+class VerificationServer:
+    def __init__(self, batcher: MicroBatcher):
+        self.batcher = batcher
+        self.started = time.time()
+        self.requests = 0
+
+    def metrics(self) -> Dict[str, Any]:
+        stats = dict(self.batcher.stats)
+        return {
+            **stats,
+            "requests": self.requests,
+            "pending": self.batcher.pending,
+            "max_pending": self.batcher.max_pending,
+            "mean_batch_size": stats["batched"] / stats["batches"] if stats["batches"] else 0.0,
+            "mean_group_size": stats["batched"] / stats["groups"] if stats["groups"] else 0.0,
+            "uptime_seconds": time.time() - self.started,
+            "routes": route_coverage(),
+        }
+
+    async def dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, Any]:
+        path = path.split("?", 1)[0]
+        if path == "/health":
+            return 200, {"status": "ok"}
+        if path == "/metrics":
+            return 200, self.metrics()
+        if path != "/verify":
+            return 404, {"error": f"Unknown path: {path}"}
+        if method != "POST":
+            return 405, {"error": "Use POST /verify"}
+        try:
+            payload = json.loads(body)
+        except ValueError as e:
+            return 400, {"error": f"Invalid JSON: {e}"}
+        predictions = payload if isinstance(payload, list) else [payload]
+        if not all(isinstance(p, dict) for p in predictions):
+            return 400, {"error": "Expected a prediction object or a list of them"}
+        if not self.batcher.has_capacity(len(predictions)):
+            self.batcher.stats["rejected"] += len(predictions)
+            return 503, {"error": "Too many pending predictions, retry later"}
+        futures = [self.batcher.submit(p) for p in predictions]
+        results = [
+            VerificationResult(Verdict.UNKNOWN, 0.0, f"Verification failed: {str(r)}")
+            if isinstance(r, Exception) else r
+            for r in await asyncio.gather(*futures, return_exceptions=True)
+        ]
+        return 200, results if isinstance(payload, list) else results[0]
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, path, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {"error": "Request body too large"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                self.requests += 1
+                status, result = await self.dispatch(method.upper(), path, body)
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+                await self._respond(writer, status, result, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, result: Any, keep_alive: bool):
+        body = json.dumps(result).encode("utf-8")
+        headers = [
+            f"HTTP/1.1 {status} {_REASONS.get(status, '')}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if status == 503:
+            headers.append("Retry-After: 1")
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+
+async def serve(host: str = "127.0.0.1", port: int = 8080, workers: int = 16,
+                window_ms: float = 5.0, max_batch: int = 512, max_pending: int = 10000):
+    """
+    Run the verification service until cancelled.
+    """
+    batcher = MicroBatcher(workers, window_ms, max_batch, max_pending)
+    server = VerificationServer(batcher)
+    batch_task = asyncio.ensure_future(batcher.run())
+    tcp_server = await asyncio.start_server(server.handle, host, port)
+    logger.info(f"Verification service listening on {host}:{port} with {workers} workers")
+    try:
+        async with tcp_server:
+            await tcp_server.serve_forever()
+    finally:
+        batch_task.cancel()
+        batcher.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Torus verification service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=16, help="Threads settling batches")
+    parser.add_argument("--batch-window-ms", type=float, default=5.0, help="How long to collect a micro-batch")
+    parser.add_argument("--max-batch", type=int, default=512, help="Most predictions per micro-batch")
+    parser.add_argument("--max-pending", type=int, default=10000,
+                        help="Pending predictions before requests are rejected with 503")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.batch_window_ms, args.max_batch, args.max_pending))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
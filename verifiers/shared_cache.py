@@ -0,0 +1,256 @@
+from typing import Dict, Optional, Callable
+from contextlib import contextmanager
+import fcntl
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Directory for cache files shared by all worker processes on the host, e.g.
+# /dev/shm/torus. Leave unset to keep every cache in-process.
+SHARED_CACHE_DIR = os.getenv("TORUS_SHARED_CACHE", "")
+SHARED_CACHE_MB = int(os.getenv("TORUS_SHARED_CACHE_MB", "256"))  # Size of each cache file
+SHARED_CACHE_TTL = float(os.getenv("TORUS_SHARED_CACHE_TTL", "3600"))
+
+# File layout: header, slot table, then an append-only data region.
+#   header  magic, generation, slot count, data start, data end
+#   slot    sequence, record length, key hash, record offset, expiry (0 = never)
+#   record  key length (u32), key bytes, value bytes
+# Readers never lock. A slot's sequence is odd while a writer updates it and
+# the header generation is odd while the table is being cleared; readers
+# re-check both after copying a record and read again if either changed.
+_MAGIC = b"TSC1"
+_HEADER = struct.Struct("<4sIIQQ")
+_HEADER_SIZE = 64
+_SLOT = struct.Struct("<IIQQd")
+_KEY_LEN = struct.Struct("<I")
+_MAX_PROBES = 32
+_READ_RETRIES = 1000
+
+# Slot states returned by SharedCache._read_record
+_EMPTY, _FOUND, _OTHER, _TORN = range(4)
+
+
+class SharedCacheFull(ValueError):
+    """
+    Raised by a non-evicting cache that has no room for a new key.
+    """
+
+
+def _hash(key: bytes) -> int:
+    # 0 marks an empty slot
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little") or 1
+
+
+class SharedCache:
+    """
+    Key/value cache in a memory-mapped file that every process on the host can
+    open. Reads are lock-free; writes are serialized with flock. When the data
+    region fills up the whole cache is cleared.
+
+    With evict=False the file is a store rather than a cache: keys are never
+    dropped to make room, and a write that does not fit raises SharedCacheFull.
+    """
+
+    def __init__(self, path: str, size_bytes: int = SHARED_CACHE_MB * 1024 * 1024, slots: Optional[int] = None,
+                 evict: bool = True):
+        self.path = path
+        self.evict = evict
+        # One slot per 4 KiB of file by default; the table takes about 1% of it
+        slots = slots or max(64, size_bytes // 4096)
+        if _HEADER_SIZE + slots * _SLOT.size >= size_bytes:
+            raise ValueError(f"Shared cache of {size_bytes} bytes is too small for {slots} slots")
+        self._thread_lock = threading.Lock()
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        self._lock_fd = self._fd
+        self._pid = os.getpid()
+        with self._write_lock():
+            if os.fstat(self._fd).st_size == 0:
+                os.ftruncate(self._fd, size_bytes)
+                self._mm = mmap.mmap(self._fd, size_bytes)
+                data_start = _HEADER_SIZE + slots * _SLOT.size
+                _HEADER.pack_into(self._mm, 0, _MAGIC, 0, slots, data_start, data_start)
+            else:
+                self._mm = mmap.mmap(self._fd, 0)
+                if _HEADER.unpack_from(self._mm, 0)[0] != _MAGIC:
+                    raise ValueError(f"{path} is not a shared cache file")
+        _, _, self._slots, self._data_start, _ = _HEADER.unpack_from(self._mm, 0)
+        self._size = len(self._mm)
+        # Without eviction a key may sit anywhere in the table
+        self._max_probes = _MAX_PROBES if evict else self._slots
+
+    @contextmanager
+    def _write_lock(self):
+        # flock excludes other processes; the thread lock excludes other threads
+        # of this process, which share the same open file.
+        with self._thread_lock:
+            if self._pid != os.getpid():
+                # A forked child shares the parent's open file, and with it
+                # the parent's flock, so take locks through a file of its own
+                self._lock_fd = os.open(self.path, os.O_RDWR)
+                self._pid = os.getpid()
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _generation(self) -> int:
+        return _HEADER.unpack_from(self._mm, 0)[1]
+
+    def _slot_offset(self, index: int) -> int:
+        return _HEADER_SIZE + (index % self._slots) * _SLOT.size
+
+    def _read_record(self, slot_off: int, key: bytes, key_hash: int, generation: int):
+        """
+        Copy the record in a slot if it holds key. Returns (state, value, expires, length)
+        where state is _TORN if the slot or the table changed while being read.
+        """
+        seq, length, slot_hash, offset, expires = _SLOT.unpack_from(self._mm, slot_off)
+        if seq & 1:
+            return _TORN, None, 0.0, 0
+        record = None
+        if slot_hash == key_hash and offset + length <= self._size:
+            record = self._mm[offset:offset + length]
+        if _SLOT.unpack_from(self._mm, slot_off)[0] != seq or self._generation() != generation:
+            return _TORN, None, 0.0, 0
+        if slot_hash == 0:
+            return _EMPTY, None, 0.0, 0
+        if record is None:
+            return _OTHER, None, 0.0, 0
+        (key_len,) = _KEY_LEN.unpack_from(record, 0)
+        if record[4:4 + key_len] != key:
+            return _OTHER, None, 0.0, 0
+        return _FOUND, record[4 + key_len:], expires, length
+
+    def _lookup(self, key: bytes):
+        # (state, value) where state is _FOUND, _EMPTY (a miss) or _TORN
+        key_hash = _hash(key)
+        generation = self._generation()
+        if generation & 1:
+            return _TORN, None
+        for probe in range(self._max_probes):
+            state, value, expires, _ = self._read_record(self._slot_offset(key_hash + probe), key, key_hash, generation)
+            if state == _OTHER:
+                continue
+            if state == _FOUND and expires and expires < time.time():
+                return _EMPTY, None
+            return state, value
+        return _EMPTY, None
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Value stored under key, or None if missing or expired.
+        """
+        key_bytes = key.encode("utf-8")
+        for _ in range(_READ_RETRIES):
+            state, value = self._lookup(key_bytes)
+            if state != _TORN:
+                return value
+            # A writer is updating the slot or clearing the table; read again
+            time.sleep(0)
+        # Under sustained write load, read with writers excluded
+        with self._write_lock():
+            return self._lookup(key_bytes)[1]
+
+    def _publish(self, slot_off: int, length: int, key_hash: int, offset: int, expires: float):
+        seq = _SLOT.unpack_from(self._mm, slot_off)[0]
+        _SLOT.pack_into(self._mm, slot_off, seq + 1, length, key_hash, offset, expires)
+        _SLOT.pack_into(self._mm, slot_off, seq + 2, length, key_hash, offset, expires)
+
+    def _clear_locked(self):
+        magic, generation, slots, data_start, _ = _HEADER.unpack_from(self._mm, 0)
+        _HEADER.pack_into(self._mm, 0, magic, generation + 1, slots, data_start, data_start)
+        self._mm[_HEADER_SIZE:data_start] = bytes(data_start - _HEADER_SIZE)
+        _HEADER.pack_into(self._mm, 0, magic, generation + 2, slots, data_start, data_start)
+
+    def _set_locked(self, key_bytes: bytes, value: bytes, expires: float):
+        key_hash = _hash(key_bytes)
+        record = _KEY_LEN.pack(len(key_bytes)) + key_bytes + value
+        if self._data_start + len(record) > self._size:
+            raise ValueError(f"Value for {key_bytes[:64]!r} does not fit in the shared cache")
+        generation = self._generation()
+        target = None
+        for probe in range(self._max_probes):
+            slot_off = self._slot_offset(key_hash + probe)
+            state, _, _, length = self._read_record(slot_off, key_bytes, key_hash, generation)
+            if state == _FOUND:
+                if length == len(record):
+                    # Same size: overwrite in place instead of growing the data region
+                    seq, _, _, offset, _ = _SLOT.unpack_from(self._mm, slot_off)
+                    _SLOT.pack_into(self._mm, slot_off, seq + 1, length, key_hash, offset, expires)
+                    self._mm[offset:offset + length] = record
+                    _SLOT.pack_into(self._mm, slot_off, seq + 2, length, key_hash, offset, expires)
+                    return
+                target = slot_off
+                break
+            if state == _EMPTY:
+                target = slot_off
+                break
+        if target is None:
+            if not self.evict:
+                raise SharedCacheFull(f"No free slot for {key_bytes[:64]!r} in {self.path}")
+            # Probe window is full: evict the key's home slot
+            target = self._slot_offset(key_hash)
+
+        magic, generation, slots, data_start, data_end = _HEADER.unpack_from(self._mm, 0)
+        if data_end + len(record) > self._size:
+            if not self.evict:
+                raise SharedCacheFull(f"No room for {key_bytes[:64]!r} in {self.path}")
+            logger.info(f"Shared cache {self.path} is full, clearing it")
+            self._clear_locked()
+            self._set_locked(key_bytes, value, expires)
+            return
+        self._mm[data_end:data_end + len(record)] = record
+        _HEADER.pack_into(self._mm, 0, magic, generation, slots, data_start, data_end + len(record))
+        self._publish(target, len(record), key_hash, data_end, expires)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        """
+        Store value under key, visible to every process once this returns.
+        """
+        expires = time.time() + ttl if ttl else 0.0
+        with self._write_lock():
+            self._set_locked(key.encode("utf-8"), bytes(value), expires)
+
+    def update(self, key: str, fn: Callable[[Optional[bytes]], bytes]):
+        """
+        Atomically replace the value under key with fn(current value or None).
+        """
+        with self._write_lock():
+            current = self._lookup(key.encode("utf-8"))[1]
+            self._set_locked(key.encode("utf-8"), fn(current), 0.0)
+
+    def clear(self):
+        with self._write_lock():
+            self._clear_locked()
+
+    def close(self):
+        self._mm.close()
+        if self._lock_fd != self._fd:
+            os.close(self._lock_fd)
+        os.close(self._fd)
+
+
+_caches: Dict[str, SharedCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_shared_cache(name: str, evict: bool = True) -> Optional[SharedCache]:
+    """
+    Process-wide handle on the named shared cache under TORUS_SHARED_CACHE,
+    or None if shared caching is not configured. Pass evict=False for data
+    that must not be lost, such as counters.
+    """
+    if not SHARED_CACHE_DIR:
+        return None
+    with _caches_lock:
+        if name not in _caches:
+            os.makedirs(SHARED_CACHE_DIR, exist_ok=True)
+            _caches[name] = SharedCache(os.path.join(SHARED_CACHE_DIR, f"{name}.cache"), evict=evict)
+        return _caches[name]
@@ -1,13 +1,24 @@
 from typing import Dict, Any
 import logging
-import requests
+from . import upstream
+from . import tracing
+from .result import VerificationResult, Verdict
 
 logger = logging.getLogger(__name__)
 
 THESPORTSDB_API_URL = "https://www.thesportsdb.com/api/v1/json/3/"
 
+# Subject/object keywords that route a prediction here (see router.py):
+# English Premier League clubs, since that is the league queried below
+ROUTING_KEYWORDS = [
+    'team', 'match', 'arsenal', 'aston villa', 'bournemouth', 'brentford', 'brighton', 'chelsea',
+    'crystal palace', 'everton', 'fulham', 'ipswich', 'leicester', 'liverpool', 'manchester city',
+    'man city', 'manchester united', 'man united', 'newcastle', 'nottingham forest', 'southampton',
+    'tottenham', 'spurs', 'west ham', 'wolves', 'wolverhampton'
+]
 
-def verify_sports(prediction: Dict[str, Any]) -> Dict[str, Any]:
+
+def verify_sports(prediction: Dict[str, Any]) -> VerificationResult:
     """
     Verifies if one team beat another on a specific date using TheSportsDB API.
     Args:
@@ -19,12 +30,12 @@ def verify_sports(prediction: Dict[str, Any]) -> Dict[str, Any]:
     obj = prediction.get("object", "")
     deadline = prediction.get("deadline", "")
     if not subject or not obj or not deadline:
-        return {
-            "verdict": "unknown",
-            "confidence": 0.0,
-            "justification": "Missing team names or date.",
-            "source": None
-        }
+        return VerificationResult(
+            verdict=Verdict.UNKNOWN,
+            confidence=0.0,
+            justification="Missing team names or date.",
+            source=None
+        )
     # Parse date (YYYY-MM-DD)
     date_str = deadline[:10]
     try:
@@ -32,50 +43,49 @@ def verify_sports(prediction: Dict[str, Any]) -> Dict[str, Any]:
         # In production, map teams to leagues dynamically
         url = f"{THESPORTSDB_API_URL}eventsday.php"
         params = {"d": date_str, "l": "English Premier League"}
-        resp = requests.get(url, params=params, timeout=10)
+        resp = upstream.get(url, params=params, timeout=10)
         resp.raise_for_status()
-        data = resp.json()
-        events = data.get("events", [])
-        for event in events:
-            home = event.get("strHomeTeam", "").lower()
-            away = event.get("strAwayTeam", "").lower()
-            if subject.lower() in [home, away] and obj.lower() in [home, away]:
-                home_score = int(event.get("intHomeScore", -1))
-                away_score = int(event.get("intAwayScore", -1))
-                if home_score == -1 or away_score == -1:
-                    continue
-                if subject.lower() == home and home_score > away_score:
-                    return {
-                        "verdict": "true",
-                        "confidence": 0.9,
-                        "justification": f"{subject} beat {obj} on {date_str} ({home_score}-{away_score}).",
-                        "source": event.get("strEventThumb") or None
-                    }
-                elif subject.lower() == away and away_score > home_score:
-                    return {
-                        "verdict": "true",
-                        "confidence": 0.9,
-                        "justification": f"{subject} beat {obj} on {date_str} ({away_score}-{home_score}).",
-                        "source": event.get("strEventThumb") or None
-                    }
-                else:
-                    return {
-                        "verdict": "false",
-                        "confidence": 0.8,
-                        "justification": f"{subject} did not beat {obj} on {date_str} (score: {home_score}-{away_score}).",
-                        "source": event.get("strEventThumb") or None
-                    }
-        return {
-            "verdict": "unknown",
-            "confidence": 0.0,
-            "justification": f"No match found for {subject} vs {obj} on {date_str}.",
-            "source": None
-        }
+        with tracing.span("extract"):
+            for event in upstream.iter_items(resp, "events.item"):
+                home = event.get("strHomeTeam", "").lower()
+                away = event.get("strAwayTeam", "").lower()
+                if subject.lower() in [home, away] and obj.lower() in [home, away]:
+                    home_score = int(event.get("intHomeScore", -1))
+                    away_score = int(event.get("intAwayScore", -1))
+                    if home_score == -1 or away_score == -1:
+                        continue
+                    if subject.lower() == home and home_score > away_score:
+                        return VerificationResult(
+                            verdict=Verdict.TRUE,
+                            confidence=0.9,
+                            justification=f"{subject} beat {obj} on {date_str} ({home_score}-{away_score}).",
+                            source=event.get("strEventThumb") or None
+                        )
+                    elif subject.lower() == away and away_score > home_score:
+                        return VerificationResult(
+                            verdict=Verdict.TRUE,
+                            confidence=0.9,
+                            justification=f"{subject} beat {obj} on {date_str} ({away_score}-{home_score}).",
+                            source=event.get("strEventThumb") or None
+                        )
+                    else:
+                        return VerificationResult(
+                            verdict=Verdict.FALSE,
+                            confidence=0.8,
+                            justification=f"{subject} did not beat {obj} on {date_str} (score: {home_score}-{away_score}).",
+                            source=event.get("strEventThumb") or None
+                        )
+        return VerificationResult(
+            verdict=Verdict.UNKNOWN,
+            confidence=0.0,
+            justification=f"No match found for {subject} vs {obj} on {date_str}.",
+            source=None
+        )
     except Exception as e:
         logger.error(f"Sports verifier failed: {e}")
-        return {
-            "verdict": "unknown",
-            "confidence": 0.0,
-            "justification": f"Sports verifier error: {str(e)}",
-            "source": None
-        } 
\ No newline at end of file
+        return VerificationResult(
+            verdict=Verdict.UNKNOWN,
+            confidence=0.0,
+            justification=f"Sports verifier error: {str(e)}",
+            source=None
+        ) 
\ No newline at end of file
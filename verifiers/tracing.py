@@ -0,0 +1,172 @@
+from typing import Dict, Any, Optional, Callable, List
+import json
+import logging
+import os
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Tracing is off until a callback or trace file is configured.
+TRACE_FILE = os.getenv("TORUS_TRACE_FILE", "")
+TRACE_SAMPLE_RATE = float(os.getenv("TORUS_TRACE_SAMPLE", "1.0"))  # Fraction of verify calls traced
+TRACE_SLOW_MS = float(os.getenv("TORUS_TRACE_SLOW_MS", "0"))  # Only emit traces at least this slow
+
+_callbacks: List[Callable[["Span"], None]] = []
+_file_lock = threading.Lock()
+_local = threading.local()
+
+
+class Span:
+    """
+    One timed stage of a verify call. The root span of each trace is handed
+    to the callbacks; use to_dict() for a JSON-friendly tree.
+    """
+
+    __slots__ = ("name", "attrs", "children", "start", "end", "timestamp")
+
+    def __init__(self, name: str, attrs: Dict[str, Any]):
+        self.name = name
+        self.attrs = attrs
+        self.children: List[Span] = []
+        self.timestamp = time.time()
+        self.start = time.perf_counter()
+        self.end = None
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end if self.end is not None else time.perf_counter()
+        return (end - self.start) * 1000.0
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def to_dict(self, origin: Optional[float] = None) -> Dict[str, Any]:
+        origin = self.start if origin is None else origin
+        data = {
+            "name": self.name,
+            "start_ms": round((self.start - origin) * 1000.0, 3),
+            "duration_ms": round(self.duration_ms, 3),
+        }
+        if self.attrs:
+            data["attrs"] = self.attrs
+        if self.children:
+            data["children"] = [child.to_dict(origin) for child in self.children]
+        return data
+
+    def __enter__(self):
+        stack = _local.stack
+        stack[-1].children.append(self)
+        stack.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = time.perf_counter()
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        _local.stack.pop()
+
+
+class _RootSpan(Span):
+    __slots__ = ()
+
+    def __enter__(self):
+        _local.stack = [self]
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = time.perf_counter()
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        _local.stack = None
+        if self.duration_ms >= TRACE_SLOW_MS:
+            _emit(self)
+
+
+class _NullSpan:
+    """
+    Stand-in returned when the current call is not traced.
+    """
+
+    __slots__ = ()
+
+    def set(self, **attrs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def enabled() -> bool:
+    return bool(_callbacks or TRACE_FILE)
+
+
+def trace(name: str, **attrs):
+    """
+    Start a trace for one verify call, subject to sampling. Nested calls
+    while a trace is active become spans of it.
+    """
+    if getattr(_local, "stack", None):
+        return Span(name, attrs)
+    if not enabled() or random.random() >= TRACE_SAMPLE_RATE:
+        return _NULL_SPAN
+    return _RootSpan(name, attrs)
+
+
+def span(name: str, **attrs):
+    """
+    Time a stage of the current trace; a no-op when nothing is being traced.
+    """
+    if not getattr(_local, "stack", None):
+        return _NULL_SPAN
+    return Span(name, attrs)
+
+
+def _emit(root: Span):
+    for callback in list(_callbacks):
+        try:
+            callback(root)
+        except Exception as e:
+            logger.error(f"Trace callback failed: {e}")
+    if TRACE_FILE:
+        line = json.dumps(dict(root.to_dict(), timestamp=root.timestamp), default=str)
+        try:
+            with _file_lock:
+                with open(TRACE_FILE, "a") as f:
+                    f.write(line + "\n")
+        except OSError as e:
+            logger.error(f"Could not write trace to {TRACE_FILE}: {e}")
+
+
+def add_trace_callback(callback: Callable[[Span], None]):
+    """
+    Call callback with the root span of every emitted trace.
+    """
+    _callbacks.append(callback)
+
+
+def remove_trace_callback(callback: Callable[[Span], None]):
+    if callback in _callbacks:
+        _callbacks.remove(callback)
+
+
+def configure_tracing(trace_file: Optional[str] = None, sample_rate: Optional[float] = None,
+                      slow_ms: Optional[float] = None):
+    """
+    Override the TORUS_TRACE_* settings at runtime. Pass trace_file="" to
+    stop writing the JSONL trace file.
+    """
+    global TRACE_FILE, TRACE_SAMPLE_RATE, TRACE_SLOW_MS
+    if trace_file is not None:
+        TRACE_FILE = trace_file
+    if sample_rate is not None:
+        TRACE_SAMPLE_RATE = sample_rate
+    if slow_ms is not None:
+        TRACE_SLOW_MS = slow_ms
@@ -0,0 +1,198 @@
+from typing import Dict, Any, Optional, Iterator, List, Tuple
+from contextlib import contextmanager
+from urllib.parse import urlencode, urlsplit, urlunsplit, parse_qsl
+import logging
+import os
+import threading
+import weakref
+import requests
+from .shared_cache import get_shared_cache, SHARED_CACHE_TTL
+from .response_store import get_response_store
+from . import tracing
+
+logger = logging.getLogger(__name__)
+
+# Parse upstream responses incrementally instead of materializing the whole
+# payload with resp.json(). Requires ijson; falls back to resp.json() without it.
+STREAM_JSON = os.getenv("TORUS_STREAM_JSON", "").lower() in ("1", "true", "yes")
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+def streaming_enabled() -> bool:
+    """
+    Whether uncached responses may be parsed incrementally. Bodies that go
+    into the shared cache or the response store have to be read in full, so
+    streaming is skipped while either is configured.
+    """
+    return STREAM_JSON and ijson is not None
+
+
+_stream_skip_logged = False
+
+
+def _log_stream_skipped():
+    global _stream_skip_logged
+    if not _stream_skip_logged:
+        _stream_skip_logged = True
+        logger.warning("TORUS_STREAM_JSON is ignored while the shared cache or response store is enabled; "
+                       "responses are buffered in full")
+
+
+# Per-thread memo of responses, active inside shared_responses()
+_local = threading.local()
+
+# Responses returned with an unread body, to be parsed incrementally
+_streamed = weakref.WeakSet()
+
+
+# Credentials are left out of request keys so recordings, caches and traces
+# never contain them and stay valid when a key is rotated.
+_CREDENTIAL_PARAMS = {"c", "key", "apikey", "api_key", "token", "access_token"}
+
+
+def request_key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Normalized URL plus sorted query parameters identifying an upstream GET.
+    """
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    query.extend((name, str(value)) for name, value in (params or {}).items())
+    query = sorted((name, value) for name, value in query if name.lower() not in _CREDENTIAL_PARAMS)
+    key = urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, "", ""))
+    return f"{key}?{urlencode(query)}" if query else key
+
+
+@contextmanager
+def shared_responses():
+    """
+    Within the block, identical GETs on this thread reuse the first response
+    instead of hitting the upstream again.
+    """
+    previous = getattr(_local, "responses", None)
+    _local.responses = {}
+    try:
+        yield
+    finally:
+        _local.responses = previous
+
+
+def _buffered_response(url: str, body: bytes, status: int = 200) -> requests.Response:
+    resp = requests.Response()
+    resp.status_code = status
+    resp.url = url
+    resp._content = body
+    return resp
+
+
+def _fetch(url: str, params: Optional[Dict[str, Any]], timeout: int, key: str, buffered: bool) -> Tuple[requests.Response, str]:
+    store = get_response_store()
+    if store is not None and store.replaying:
+        status, body = store.load(key)
+        return _buffered_response(url, body, status), "store"
+    cache = get_shared_cache("responses")
+    if cache is not None:
+        # Another worker process may already have fetched this
+        body = cache.get(key)
+        if body is not None:
+            # Another worker fetched it, but this one is recording too
+            if store is not None and key not in store:
+                store.save(key, 200, body)
+            return _buffered_response(url, body), "shared_cache"
+    stream = streaming_enabled() and not buffered
+    if stream and (cache is not None or store is not None):
+        _log_stream_skipped()
+        stream = False
+    resp = requests.get(url, params=params, timeout=timeout, stream=stream)
+    if stream:
+        _streamed.add(resp)
+        return resp, "network"
+    if cache is not None and resp.status_code == 200:
+        # Caching is best-effort; the response is good either way
+        try:
+            cache.set(key, resp.content, SHARED_CACHE_TTL)
+        except (ValueError, OSError) as e:
+            logger.warning(f"Could not cache response for {key}: {e}")
+    if store is not None:
+        store.save(key, resp.status_code, resp.content)
+    return resp, "network"
+
+
+def get(url: str, params: Optional[Dict[str, Any]] = None, timeout: int = 10) -> requests.Response:
+    """
+    GET an upstream endpoint, reusing responses already fetched inside
+    shared_responses() or by any worker through the shared cache, and
+    recording or replaying through the response store when configured. In
+    streaming mode an uncached body is left unread so it can be consumed
+    with iter_items / iter_values.
+    """
+    key = request_key(url, params)
+    with tracing.span("upstream_request", url=key) as span:
+        responses = getattr(_local, "responses", None)
+        if responses is not None and key in responses:
+            span.set(source="batch")
+            return responses[key]
+        # Shared responses are read by several verifiers, so they are always buffered
+        resp, source = _fetch(url, params, timeout, key, buffered=responses is not None)
+        span.set(source=source, status=resp.status_code)
+        if responses is not None:
+            responses[key] = resp
+        return resp
+
+
+def _walk(node: Any, parts: List[str]) -> Iterator[Any]:
+    # Mirrors ijson prefixes on an already-parsed document: "item" steps into
+    # every element of a list, any other part is a dict key.
+    if not parts:
+        yield node
+        return
+    head, rest = parts[0], parts[1:]
+    if head == "item":
+        if isinstance(node, list):
+            for child in node:
+                yield from _walk(child, rest)
+    elif isinstance(node, dict) and head in node:
+        yield from _walk(node[head], rest)
+
+
+def _body(resp: requests.Response):
+    resp.raw.decode_content = True
+    return resp.raw
+
+
+def iter_items(resp: requests.Response, prefix: str) -> Iterator[Any]:
+    """
+    Yield the JSON values at an ijson-style prefix, e.g. "prices.item" for
+    every element of the top-level "prices" array, or "item" for every
+    element of a top-level array.
+    """
+    if resp not in _streamed:
+        with tracing.span("decode"):
+            data = resp.json()
+        yield from _walk(data, prefix.split(".") if prefix else [])
+        return
+    try:
+        yield from ijson.items(_body(resp), prefix, use_float=True)
+    finally:
+        resp.close()
+
+
+def iter_values(resp: requests.Response, prefix: str) -> Iterator[Any]:
+    """
+    Yield the values of the JSON object at prefix, e.g. "query.pages".
+    """
+    if resp not in _streamed:
+        with tracing.span("decode"):
+            data = resp.json()
+        for node in _walk(data, prefix.split(".") if prefix else []):
+            if isinstance(node, dict):
+                yield from node.values()
+        return
+    try:
+        for _, value in ijson.kvitems(_body(resp), prefix, use_float=True):
+            yield value
+    finally:
+        resp.close()